@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Describes a whole photo album ahead of a session and stores the results in the DescriptionCache.
+
+Photos already in the cache are skipped. The rest are decoded, resized and
+encoded in a process pool, then sent to the vision model from a thread pool
+that bounds how many requests are in flight. Each description is written to
+the cache as soon as it finishes, so a cancelled or interrupted run keeps
+what it has done.
+
+  python album_batch.py <folder> [--prep-workers 4] [--max-requests 4]
+"""
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from image_prep import prepare_for_model
+
+PREP_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+MAX_REQUESTS = 4  # concurrent requests to the vision model
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+def image_files(folder):
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                  if name.lower().endswith(IMAGE_EXTENSIONS))
+
+
+class AlbumProgress:
+    def __init__(self, total):
+        self.total = total
+        self.described = 0
+        self.cached = 0
+        self.failed = 0
+        self.last_path = None
+        self.last_status = None
+        self.started = time.time()
+        self.finished = False
+        self.cancelled = False
+
+    @property
+    def done(self):
+        return self.described + self.cached + self.failed
+
+    def copy(self):
+        snapshot = AlbumProgress(self.total)
+        snapshot.__dict__.update(self.__dict__)
+        return snapshot
+
+    def __str__(self):
+        return (f"{self.done}/{self.total} ({self.described} described, {self.cached} cached, "
+                f"{self.failed} failed) in {time.time() - self.started:.0f} s")
+
+
+def _describe(image_path, encoded):
+    from image_description import ImageDescriber
+    return ImageDescriber(image_path=image_path, encoded=encoded).response.output_text
+
+
+def describe_album(paths, cache, prep_workers=PREP_WORKERS, max_requests=MAX_REQUESTS,
+                   on_progress=None, cancel_event=None):
+    """Describe every image in paths (a folder or a list of files) that is not cached yet.
+
+    on_progress(AlbumProgress) gets a snapshot after every photo; set cancel_event
+    to stop early. Returns the final AlbumProgress.
+    """
+    from image_description import description_key
+
+    if isinstance(paths, str):
+        paths = image_files(paths)
+    progress = AlbumProgress(len(paths))
+    cancel_event = cancel_event or threading.Event()
+
+    def report(path, status, error=None):
+        setattr(progress, status, getattr(progress, status) + 1)
+        progress.last_path, progress.last_status = path, status
+        if error is not None:
+            print(f"[AlbumBatch] {os.path.basename(path)} failed: {error}")
+        if on_progress:
+            on_progress(progress.copy())
+
+    todo = []
+    for path in paths:
+        if cancel_event.is_set():
+            break
+        try:
+            key = description_key(path)
+        except OSError as e:
+            report(path, "failed", e)
+            continue
+        if cache.get(key) is not None:
+            report(path, "cached")
+        else:
+            todo.append((path, key))
+
+    # Spawned rather than forked workers: the GUI process has Tk and other threads running
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=prep_workers, mp_context=context) as prep_pool, \
+            ThreadPoolExecutor(max_workers=max_requests, thread_name_prefix="album-request") as request_pool:
+        jobs = {}
+        queued = iter(todo)
+        # Keep only a few encoded photos waiting, not the whole album in memory
+        in_flight_limit = prep_workers + 2 * max_requests
+
+        def fill():
+            while len(jobs) < in_flight_limit and not cancel_event.is_set():
+                item = next(queued, None)
+                if item is None:
+                    return
+                jobs[prep_pool.submit(prepare_for_model, item[0])] = ("prep",) + item
+
+        fill()
+        while jobs:
+            done, _ = wait(list(jobs), return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, path, key = jobs.pop(future)
+                if future.cancelled():
+                    continue
+                try:
+                    result = future.result()
+                except Exception as e:
+                    report(path, "failed", e)
+                    continue
+                if stage == "prep":
+                    if not cancel_event.is_set():
+                        jobs[request_pool.submit(_describe, path, result)] = ("request", path, key)
+                else:
+                    cache.put(key, result, source=path)
+                    report(path, "described")
+            if cancel_event.is_set():
+                # Requests already sent are left to finish and are still cached
+                for future in list(jobs):
+                    if future.cancel():
+                        jobs.pop(future)
+            fill()
+
+    progress.cancelled = cancel_event.is_set()
+    progress.finished = True
+    if on_progress:
+        on_progress(progress.copy())
+    return progress
+
+
+def main():
+    from description_cache import DEFAULT_CACHE_PATH, DescriptionCache, print_stats
+
+    parser = argparse.ArgumentParser(description="Describe a photo album ahead of a session")
+    parser.add_argument("folder")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH)
+    parser.add_argument("--prep-workers", type=int, default=PREP_WORKERS)
+    parser.add_argument("--max-requests", type=int, default=MAX_REQUESTS)
+    args = parser.parse_args()
+
+    cache = DescriptionCache(args.cache)
+    cancel_event = threading.Event()
+
+    def print_progress(progress):
+        if not progress.finished:
+            print(f"[AlbumBatch] {progress} - {os.path.basename(progress.last_path)}: {progress.last_status}")
+
+    try:
+        progress = describe_album(args.folder, cache, args.prep_workers, args.max_requests,
+                                  on_progress=print_progress, cancel_event=cancel_event)
+    except KeyboardInterrupt:
+        cancel_event.set()
+        print("[AlbumBatch] Interrupted, descriptions finished so far are cached.")
+    else:
+        print(f"[AlbumBatch] Done: {progress}")
+    print_stats(cache)
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
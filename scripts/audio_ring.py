@@ -0,0 +1,124 @@
+"""Shared-memory ring buffer for int16 audio between the Vapi process and the MiRo process.
+
+Replaces the multiprocessing.Queue the speaker audio used to go through, which
+pickled every chunk and sent it down a pipe. Here the producer (DailyCall.recv_audio)
+copies samples straight into shared memory and the consumer (run_miro_with_queue)
+copies them out, with a write index and a read index in shared memory.
+
+It is single producer / single consumer: only the producer moves the write index
+and only the consumer moves the read index, so neither side needs a lock.
+put() and get_nowait() match multiprocessing.Queue so the existing callers keep working.
+"""
+import ctypes
+import queue
+from multiprocessing import RawArray
+
+import numpy as np
+
+# Slots in the index block
+_WRITE = 0            # total samples ever written (producer only)
+_READ = 1             # total samples ever read (consumer only)
+_DROPPED_SAMPLES = 2  # samples thrown away because the ring was full (producer only)
+_DROPPED_WRITES = 3   # writes thrown away because the ring was full (producer only)
+_SLOTS = 4
+
+
+class AudioRing:
+    def __init__(self, capacity=1 << 16, block=640):
+        # capacity is in samples and must be a power of two (65536 samples is ~8 s at 8 kHz)
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.capacity = capacity
+        self.block = block
+        self._mask = capacity - 1
+        self._samples = RawArray(ctypes.c_int16, capacity)
+        self._index = RawArray(ctypes.c_int64, _SLOTS)
+        self._view = None
+
+    def __getstate__(self):
+        # The numpy view is rebuilt in the child process, only the shared arrays are sent
+        state = self.__dict__.copy()
+        state["_view"] = None
+        return state
+
+    @property
+    def _buffer(self):
+        if self._view is None:
+            self._view = np.frombuffer(self._samples, dtype=np.int16)
+        return self._view
+
+    def available(self):
+        """Number of samples waiting to be read."""
+        return self._index[_WRITE] - self._index[_READ]
+
+    def write(self, samples):
+        """Copy samples into the ring. Returns False (and counts an overrun) if they do not fit."""
+        samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+        n = samples.size
+        write = self._index[_WRITE]
+        if n > self.capacity - (write - self._index[_READ]):
+            # Drop the new audio rather than touch the consumer's read index
+            self._index[_DROPPED_SAMPLES] += n
+            self._index[_DROPPED_WRITES] += 1
+            return False
+
+        buf = self._buffer
+        start = write & self._mask
+        first = min(n, self.capacity - start)
+        buf[start:start + first] = samples[:first]
+        if first < n:
+            buf[:n - first] = samples[first:]
+        # Publish only after the samples are in place
+        self._index[_WRITE] = write + n
+        return True
+
+    def read(self, max_samples=None, out=None):
+        """Copy out up to max_samples samples (default: one block). Returns an empty array if there are none.
+
+        If out is given the samples are written into it and a view of the filled part is returned.
+        """
+        if max_samples is None:
+            max_samples = self.block
+        if out is not None:
+            max_samples = min(max_samples, len(out))
+        read = self._index[_READ]
+        n = min(self._index[_WRITE] - read, max_samples)
+        if out is None:
+            out = np.empty(n, dtype=np.int16)
+        if n <= 0:
+            return out[:0]
+
+        buf = self._buffer
+        start = read & self._mask
+        first = min(n, self.capacity - start)
+        out[:first] = buf[start:start + first]
+        if first < n:
+            out[first:n] = buf[:n - first]
+        self._index[_READ] = read + n
+        return out[:n]
+
+    def discard(self, n):
+        """Skip up to n of the oldest unread samples (consumer side). Returns how many were skipped."""
+        read = self._index[_READ]
+        n = max(0, min(n, self._index[_WRITE] - read))
+        self._index[_READ] = read + n
+        return n
+
+    def stats(self):
+        return {
+            "available": self.available(),
+            "written": self._index[_WRITE],
+            "read": self._index[_READ],
+            "dropped_samples": self._index[_DROPPED_SAMPLES],
+            "dropped_writes": self._index[_DROPPED_WRITES],
+        }
+
+    # multiprocessing.Queue-style API used by DailyCall and run_miro_with_queue
+    def put(self, samples):
+        self.write(samples)
+
+    def get_nowait(self):
+        chunk = self.read(self.block)
+        if chunk.size == 0:
+            raise queue.Empty
+        return chunk
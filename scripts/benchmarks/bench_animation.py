@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Per-tick cost of AnimationEngine.evaluate as more behaviours are declared.
+
+Declares 5, 50 and 500 random oscillator behaviours and times evaluate() in
+three states: steady in one behaviour, blending into another, and blending
+with a blink clip playing. The cost should not depend on how many behaviours exist.
+"""
+import argparse
+import math
+import random
+
+import bench_utils
+import numpy as np
+
+from miro_animation import CHANNELS, AnimationEngine, Behaviour, Clip
+
+# A blink held shut for the whole run, so every timed tick samples it
+HELD_BLINK = Clip([0.0, 0.05, 1e6, 1e6 + 0.05], {"eyelid_left": [0.0, 1.0, 1.0, 0.0], "eyelid_right": [0.0, 1.0, 1.0, 0.0]})
+
+
+def random_behaviour(rng):
+    channels = rng.sample(CHANNELS, 4)
+    return Behaviour(base={channels[0]: rng.random()},
+                     oscillators={name: (rng.random(), rng.uniform(0.1, 4.0), rng.uniform(0, math.pi)) for name in channels})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for count in (5, 50, 500):
+        behaviours = {f"b{n}": random_behaviour(rng) for n in range(count)}
+        engine = AnimationEngine(behaviours, blend_seconds=1e9)  # a blend that never finishes
+        times = iter(np.arange(0, 1e6, 0.02))
+
+        engine.set_behaviour("b0", 0.0)
+        engine.blend_from = None
+        steady = bench_utils.time_call(lambda: engine.evaluate(next(times)), repeat=args.ticks)
+        engine.set_behaviour("b1", next(times))
+        blending = bench_utils.time_call(lambda: engine.evaluate(next(times)), repeat=args.ticks)
+        engine.play(HELD_BLINK, next(times))
+        with_clip = bench_utils.time_call(lambda: engine.evaluate(next(times)), repeat=args.ticks)
+        print(f"{count:4d} behaviours  steady {steady * 1e6:6.1f} us  blending {blending * 1e6:6.1f} us  "
+              f"blending + blink {with_clip * 1e6:6.1f} us per tick")
+
+
+if __name__ == "__main__":
+    main()
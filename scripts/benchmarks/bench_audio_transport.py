@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""CPU cost per second of audio for moving speaker chunks from the Vapi process to the MiRo process.
+
+Compares the old path (multiprocessing.Queue, then chunk.tolist() and genpy's
+struct packing for Int16MultiArray) with AudioRing plus numpy_msg serialisation
+(ndarray.tobytes()). The producer runs in a child process and the consumer in
+this one. Both run flat out, and CPU time is divided by the seconds of audio moved.
+"""
+import argparse
+import struct
+import time
+from multiprocessing import Process, Queue
+
+import numpy as np
+
+import bench_utils  # noqa: F401  (puts scripts/ on the path)
+
+from audio_ring import AudioRing
+
+SAMPLE_RATE = 8000
+CHUNK_SIZE = 640
+
+# Copies of the samples made between recv_audio and the bytes handed to ROS
+COPIES = {
+    "queue": "pickle, pipe write, pipe read, unpickle, tolist, struct.pack = 6",
+    "ring": "ring write, ring read, tobytes = 3",
+}
+
+
+def make_chunks(seconds):
+    rng = np.random.default_rng(0)
+    count = int(seconds * SAMPLE_RATE / CHUNK_SIZE)
+    return [rng.integers(-3000, 3000, CHUNK_SIZE, dtype=np.int16) for _ in range(count)]
+
+
+def produce(kind, transport, seconds, cpu):
+    chunks = make_chunks(seconds)
+    start = time.process_time()
+    for chunk in chunks:
+        transport.put(chunk)
+    if kind == "queue":
+        transport.close()
+        transport.join_thread()  # include the feeder thread's pickling
+    cpu.put(time.process_time() - start)
+
+
+def consume_queue(transport, count):
+    start = time.process_time()
+    for _ in range(count):
+        chunk = transport.get()
+        data = chunk.tolist()
+        struct.pack("<%sh" % len(data), *data)
+    return time.process_time() - start
+
+
+def consume_ring(ring, count):
+    out = np.empty(CHUNK_SIZE, dtype=np.int16)
+    start = time.process_time()
+    for _ in range(count):
+        ring.read(CHUNK_SIZE, out=out).tobytes()
+    return time.process_time() - start
+
+
+def run(kind, seconds):
+    count = int(seconds * SAMPLE_RATE / CHUNK_SIZE)
+    cpu = Queue()
+    transport = Queue() if kind == "queue" else AudioRing(capacity=1 << 22)
+    proc = Process(target=produce, args=(kind, transport, seconds, cpu))
+    proc.start()
+    if kind == "queue":
+        consumer_cpu = consume_queue(transport, count)
+    else:
+        # Let the producer finish first so the consumer never spins on an empty ring
+        proc.join()
+        consumer_cpu = consume_ring(transport, count)
+    producer_cpu = cpu.get()
+    proc.join()
+    total = producer_cpu + consumer_cpu
+    print(f"{kind:<6} producer={producer_cpu / seconds * 1000:7.3f} ms/s  consumer={consumer_cpu / seconds * 1000:7.3f} ms/s  "
+          f"total={total / seconds * 1000:7.3f} ms CPU per s of audio  copies: {COPIES[kind]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=300.0, help="seconds of 8 kHz audio to move")
+    args = parser.parse_args()
+    run("queue", args.seconds)
+    run("ring", args.seconds)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Handler time for conversation-update as the conversation grows to thousands of turns.
+
+Each step appends one assistant and one user turn and delivers the whole
+conversation, like Vapi does. The message is handed to the handler already
+decoded, so the numbers are handler time only (JSON decoding is measured
+separately by bench_webhook_decode.py). Handler time should stay flat.
+"""
+import argparse
+import asyncio
+import time
+
+from bench_utils import percentile
+
+from main import create_app
+
+
+async def run(args):
+    app = create_app({"current_mode": "idle"}, classifier=lambda text: "neutral")
+    handle_message = app.state.handle_message
+    conversation = [{"role": "system", "content": "You are a reminiscence therapist."}]
+    checkpoints = set(args.checkpoints)
+    window = []
+
+    for turn in range(1, args.turns + 1):
+        conversation.append({"role": "assistant", "content": f"What happened next in story {turn}?"})
+        conversation.append({"role": "user", "content": f"We went to the seaside, that was turn {turn}."})
+        msg = {"type": "conversation-update", "call": {"id": "bench"}, "conversation": conversation}
+        start = time.perf_counter()
+        await handle_message(msg)
+        window.append(time.perf_counter() - start)
+        if turn in checkpoints:
+            recent = window[-args.window:]
+            print(f"turns={turn:>6}  entries={len(conversation):>6}  "
+                  f"p50={percentile(recent, 50) * 1e6:8.1f} us  p99={percentile(recent, 99) * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=5000)
+    parser.add_argument("--window", type=int, default=50, help="updates per reported percentile")
+    parser.add_argument("--checkpoints", type=int, nargs="*", default=[100, 500, 1000, 2000, 5000])
+    asyncio.run(run(parser.parse_args()))
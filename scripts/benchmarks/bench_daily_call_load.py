@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Load test of the DailyCall audio engine with fake Daily and PyAudio devices.
+
+Runs several DailyCall instances side by side, each feeding its own AudioRing,
+and reports process CPU, per-thread CPU, buffer overruns/underruns and how long
+leave() takes. Exits non-zero if any call lost audio or leave() was slow.
+"""
+import argparse
+import time
+
+import bench_utils  # noqa: F401  (puts scripts/ on the path)
+import fake_audio
+
+fake_audio.install()
+
+from audio_ring import AudioRing  # noqa: E402
+from client_sdk_python_main.vapi_python.daily_call import DailyCall  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--max-leave-ms", type=float, default=500.0)
+    args = parser.parse_args()
+
+    rings = [AudioRing() for _ in range(args.calls)]
+    calls = [DailyCall(ring) for ring in rings]
+    for call in calls:
+        call.join("https://example.daily.co/fake")
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    time.sleep(args.seconds)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    leave_times = []
+    for call in calls:
+        start = time.perf_counter()
+        call.leave()
+        leave_times.append(time.perf_counter() - start)
+
+    print(f"{args.calls} calls for {wall:.1f} s, process CPU {100 * cpu / wall:.1f}% of one core")
+    failed = False
+    for i, (call, ring) in enumerate(zip(calls, rings)):
+        stats = call.stats()
+        print(f"call {i}: mic={stats['mic_chunks']} spk={stats['speaker_chunks']} "
+              f"empty_reads={stats['speaker_empty_reads']} "
+              f"mic_overruns={stats['mic_overruns']} playback_overruns={stats['playback_overruns']} "
+              f"playback_underruns={stats['playback_underruns']} "
+              f"send_cpu={stats['send_cpu_seconds'] * 1000:.1f} ms recv_cpu={stats['recv_cpu_seconds'] * 1000:.1f} ms "
+              f"ring_dropped={ring.stats()['dropped_samples']}")
+        if stats["mic_overruns"] or stats["playback_overruns"] or not stats["speaker_chunks"]:
+            failed = True
+    bench_utils.report("leave()", leave_times)
+    if max(leave_times) * 1000 > args.max_leave_ms:
+        print(f"leave() took longer than {args.max_leave_ms} ms")
+        failed = True
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
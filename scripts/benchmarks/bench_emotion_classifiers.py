@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Throughput (utterances per second) of each emotion classifier backend.
+
+The local backend runs offline. The OpenAI backends make real API calls, so they
+are only measured with --remote (and need a key in main.py).
+"""
+import argparse
+import time
+
+from bench_utils import percentile
+
+from main import make_classifier
+
+UTTERANCES = [
+    "okay", "sure", "I don't know", "maybe",
+    "I loved going to the seaside with my sister every summer",
+    "I really miss my husband, he passed away a few years ago",
+    "That was our first house, we painted the door blue",
+    "I was never very happy at that school",
+    "We used to dance in the kitchen on Saturday nights",
+    "I get confused about which year that was",
+    "My father worked at the mill for forty years",
+    "That is a lovely picture, it makes me smile",
+]
+
+
+def bench(backend, rounds):
+    classifier = make_classifier(backend)
+    per_call = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in UTTERANCES:
+            t0 = time.perf_counter()
+            classifier(text)
+            per_call.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    n = len(per_call)
+    print(f"{backend:<14} {n:>8} utterances  {n / elapsed:>12.0f} utt/s  "
+          f"p50={percentile(per_call, 50) * 1e6:10.1f} us  p99={percentile(per_call, 99) * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=5000, help="passes over the sample utterances (local)")
+    parser.add_argument("--remote", action="store_true", help="also benchmark the OpenAI backends")
+    parser.add_argument("--remote-rounds", type=int, default=1)
+    args = parser.parse_args()
+
+    bench("local", args.rounds)
+    if args.remote:
+        bench("openai", args.remote_rounds)
+        bench("local+openai", args.remote_rounds)
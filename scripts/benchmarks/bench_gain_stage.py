@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Per-chunk time and allocations of the speaker gain stage in DailyCall.recv_audio.
+
+Compares the old float32 multiply/clip path with GainStage, and checks GainStage
+against the old path as a reference: with the soft limiter off the output must
+match it exactly, with it on samples below the knee must still match.
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import bench_utils  # noqa: F401  (puts scripts/ on the path)
+import fake_audio
+
+fake_audio.install()  # the SDK package imports daily and pyaudio, not needed for the gain stage
+
+from client_sdk_python_main.vapi_python.daily_call import CHUNK_SIZE, SOFT_LIMIT_KNEE, GainStage  # noqa: E402
+
+
+def reference_gain(buf, gain=5):
+    # The original recv_audio code
+    samples = np.frombuffer(buf, dtype=np.int16).astype(np.float32) * gain
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+
+def peak_bytes(fn, buf):
+    """Extra bytes allocated at the peak of one call (temporaries included)."""
+    tracemalloc.start()
+    fn(buf)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    fn(buf)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - current
+
+
+def measure(name, fn, buf, repeat):
+    baseline = peak_bytes(lambda b: None, buf)
+    extra = peak_bytes(fn, buf) - baseline
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(buf)
+    per_chunk = (time.perf_counter() - start) / repeat
+    print(f"{name:<22} {per_chunk * 1e6:8.2f} us/chunk  peak allocation per chunk={extra:6d} B")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--gain", type=float, default=5.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    chunk = rng.integers(-32768, 32767, CHUNK_SIZE, dtype=np.int16)
+    buf = chunk.tobytes()
+
+    hard = GainStage(args.gain, soft_limit=False)
+    soft = GainStage(args.gain, soft_limit=True)
+
+    ref = reference_gain(buf, args.gain)
+    assert np.array_equal(hard.process(buf), ref), "hard-clip GainStage differs from reference"
+    below_knee = np.abs(ref.astype(np.int32)) < SOFT_LIMIT_KNEE * 32767
+    assert np.array_equal(soft.process(buf)[below_knee], ref[below_knee]), "soft limiter changed quiet samples"
+    print("reference check: OK")
+
+    measure("float32 + clip (old)", lambda b: reference_gain(b, args.gain), buf, args.repeat)
+    measure("GainStage hard clip", hard.process, buf, args.repeat)
+    measure("GainStage soft limit", soft.process, buf, args.repeat)
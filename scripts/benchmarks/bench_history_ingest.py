@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Time to load 1-, 20- and 100-page patient histories.
+
+Compares the old path (open the PDF twice: render page 0 at full size for the
+preview, then read page 0's text) with ingest_history() cold (no cache) and
+warm (cached by file hash), and reports how much text reaches the assistant.
+The PDFs are generated with sectioned life-history text, different on every
+page, and only some sections mention what the benchmark photos show.
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+import bench_utils
+
+from history_ingest import ingest_history
+
+# Sentence templates per section. SCHOOL, FAMILY_MEMBERS and FAVOURITE_MEMORIES share words with
+# the photos in bench_history_retrieval.py, the others do not.
+SECTION_SENTENCES = {
+    "CHILDHOOD": [
+        "In {year} the family moved to a terraced house on {street} in {town}.",
+        "{name} kept rabbits in the back yard and fed them dandelions from the lane.",
+        "Winters in {town} meant coal fires, frost on the inside of the window and porridge before chapel.",
+        "Her mother took in sewing, and {name} sorted buttons by colour on the kitchen floor.",
+    ],
+    "SCHOOL": [
+        "At {town} primary school she sat in a class of forty in the old brick building by the railway.",
+        "Her teacher, Miss {surname}, lined the class up in front of the school for the photograph each spring.",
+        "She won the {year} spelling prize and still remembers the word 'necessary'.",
+        "The school bell rang at nine and {name} was always the last one through the gate.",
+    ],
+    "WORK": [
+        "She worked {years} years at the {mill} mill, first on the looms and later in the wages office.",
+        "In {year} she was made supervisor and ran a team of {count} machinists.",
+        "The hooter went at half past seven and the shift walked up {street} together.",
+        "She kept the accounts for the {mill} works social club until it closed.",
+    ],
+    "FAMILY_MEMBERS": [
+        "Her sister {name} married at St {saint}'s church in {year}, with the bells ringing all afternoon.",
+        "Her husband {husband} wore his father's suit for their wedding and the bride carried sweet peas.",
+        "Her son {son} was born in {year} and now lives in {town} with his two girls.",
+        "Her brother {brother} sang in the church choir and rang the bells at every wedding.",
+    ],
+    "HOBBIES": [
+        "She knitted jumpers for every grandchild and taught {name} to cast on.",
+        "On Tuesdays she played bowls at the {town} club and won the ladies' pairs in {year}.",
+        "She grew tomatoes and runner beans on an allotment off {street}.",
+        "Crosswords were a daily ritual, always in pen, always finished before lunch.",
+    ],
+    "FAVOURITE_MEMORIES": [
+        "Every summer the family went to Whitby and ate fish and chips on the harbour wall in the sun.",
+        "She remembers {name} dropping a whole cone of chips to the seagulls at Whitby harbour in {year}.",
+        "They climbed the 199 steps to the abbey and watched the boats come into the harbour.",
+        "A day trip to Scarborough in {year} ended with everyone asleep on the coach home.",
+    ],
+    "AVOID_TOPICS": [
+        "Do not bring up the house fire on {street} in {year}.",
+        "Avoid talking about hospitals; her stay in {year} still upsets her.",
+    ],
+}
+SECTIONS = list(SECTION_SENTENCES)
+SENTENCES_PER_PAGE = {"AVOID_TOPICS": 3}
+FILLS = {
+    "year": [str(y) for y in range(1938, 1990)],
+    "street": ["Gas Street", "Mill Lane", "Church Road", "Victoria Terrace", "Station Road", "Elm Grove"],
+    "town": ["Halifax", "Bradford", "Keighley", "Skipton", "Todmorden", "Otley"],
+    "name": ["Margaret", "Jean", "Dorothy", "Irene", "Elsie", "Brenda"],
+    "surname": ["Hartley", "Pickles", "Sutcliffe", "Greenwood", "Holroyd"],
+    "years": [str(n) for n in range(5, 31)],
+    "mill": ["Dean Clough", "Salts", "Lister's", "Crossley's"],
+    "count": [str(n) for n in range(4, 25)],
+    "saint": ["Mary", "John", "Paul", "Michael"],
+    "husband": ["Frank", "Harold", "Albert", "Jack"],
+    "son": ["Peter", "David", "Michael", "Stephen"],
+    "brother": ["Tom", "Arthur", "Walter", "Ernest"],
+}
+
+
+def section_text(section, rng, sentences=25):
+    """sentences lines for section, each template filled in at random so no two pages are alike."""
+    templates = SECTION_SENTENCES[section]
+    return " ".join(rng.choice(templates).format(**{key: rng.choice(values) for key, values in FILLS.items()})
+                    for _ in range(sentences))
+
+
+def make_history(path, pages, seed=0):
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        section = SECTIONS[number % len(SECTIONS)]
+        text = section_text(section, rng, SENTENCES_PER_PAGE.get(section, 25))
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), f"{section}:\n" + text, fontsize=10)
+    doc.save(path)
+    doc.close()
+
+
+def old_load(path):
+    doc = fitz.open(path)
+    pix = doc.load_page(0).get_pixmap()
+    img = Image.frombytes("RGBA" if pix.alpha else "RGB", (pix.width, pix.height), pix.samples)
+    img.thumbnail((500, 400))
+    doc.close()
+    doc = fitz.open(path)
+    text = doc[0].get_text().strip()
+    doc.close()
+    return text
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    try:
+        for pages in (1, 20, 100):
+            pdf_path = os.path.join(folder, f"history_{pages}.pdf")
+            make_history(pdf_path, pages)
+            print(f"{pages}-page history")
+
+            old_text, samples = timed(lambda: old_load(pdf_path), args.repeat)
+            bench_utils.report("  old (page 0 only)", samples)
+
+            cold = []
+            for run in range(args.repeat):
+                cache_dir = os.path.join(folder, f"cache_{pages}_{run}")
+                start = time.perf_counter()
+                history = ingest_history(pdf_path, cache_dir=cache_dir)
+                cold.append(time.perf_counter() - start)
+            bench_utils.report("  ingest, cold", cold)
+
+            _, samples = timed(lambda: ingest_history(pdf_path, cache_dir=cache_dir), args.repeat)
+            bench_utils.report("  ingest, cached", samples)
+
+            bounded, samples = timed(history.bounded_text, args.repeat)
+            bench_utils.report("  sectioned + bounded", samples)
+            print(f"  text: old {len(old_text)} chars, full {len(history.text)} chars, "
+                  f"sent {len(bounded)} chars in {len(history.sections)} sections")
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Index build time, query latency and tokens sent for history retrieval.
+
+For 1-, 20- and 100-page generated histories (plus the sample history) it
+compares what goes into patient_history_pdf: the whole text, the sectioned and
+bounded text, and the passages HistoryIndex picks for each image description
+(pinned and matching passages, by section). It also shows what a mid-call
+reply would add: a vague one like "okay" should send nothing.
+Tokens are estimated at ~4 characters each.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+import bench_utils
+from bench_history_ingest import make_history
+
+from history_index import MIN_TOPIC_SCORE, HistoryIndex, approx_tokens
+from history_ingest import ingest_history
+
+QUERIES = [
+    "A family sitting on the harbour wall at Whitby eating fish and chips in the sun",
+    "An old black and white photo of a school class lined up in front of a brick building",
+    "A church wedding with bells ringing and a bride in a white dress",
+]
+REPLIES = ["okay", "I don't know", "we went to Whitby every summer"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    try:
+        histories = [("sample", os.path.join(bench_utils.SCRIPTS_DIR, "marg-draft-history.pdf"))]
+        for pages in (1, 20, 100):
+            path = os.path.join(folder, f"history_{pages}.pdf")
+            make_history(path, pages)
+            histories.append((f"{pages} pages", path))
+
+        for name, path in histories:
+            history = ingest_history(path, cache_dir=None)
+            print(f"{name}: {len(history.text)} chars")
+            build_s = bench_utils.time_call(HistoryIndex.from_text, history.text, repeat=args.repeat)
+            index = HistoryIndex.from_text(history.text)
+            print(f"  index build      {build_s * 1000:9.3f} ms  ({len(index.passages)} passages)")
+            query_s = bench_utils.time_call(index.context_for, QUERIES[0], repeat=args.repeat)
+            print(f"  context_for      {query_s * 1000:9.3f} ms per query")
+
+            print(f"  tokens sent      whole={approx_tokens(history.text)}  "
+                  f"bounded={approx_tokens(history.bounded_text())}")
+            pinned = {id(p) for p in index.pinned()}
+            for query in QUERIES:
+                text, passages = index.context_for(query)
+                sections = sorted({p.section for p in passages if id(p) not in pinned})
+                print(f"  retrieved {approx_tokens(text):4d} tokens, {len(passages):2d} passages "
+                      f"({sum(id(p) in pinned for p in passages)} pinned, matched {', '.join(sections) or '-'})"
+                      f" for: {query[:40]}...")
+            sent = index.context_for(QUERIES[0], fill=True)[1]
+            for reply in REPLIES:
+                _, more = index.context_for(reply, 800, exclude=sent, pinned=False, min_score=MIN_TOPIC_SCORE)
+                print(f"  mid-call reply {reply!r} sends {len(more)} more passages")
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
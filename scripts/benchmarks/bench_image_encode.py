@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Bytes uploaded and encode time per image: raw file base64 (old) vs load_image + encode_for_model.
+
+Runs on every image in scripts/images/, plus a synthetic 12 MP phone photo
+(JPEG with an EXIF rotation) and a PNG with transparency made from the first
+sample, since the samples are already small.
+"""
+import argparse
+import base64
+import io
+import os
+import tempfile
+import time
+
+from PIL import Image
+
+import bench_utils
+
+from image_prep import encode_for_model, load_image
+
+IMAGES_DIR = os.path.join(bench_utils.SCRIPTS_DIR, "images")
+
+
+def old_encode(path):
+    with open(path, "rb") as image_file:
+        return base64.b64encode(image_file.read()).decode("utf-8"), "image/jpeg"
+
+
+def new_encode(path):
+    data, mime = encode_for_model(load_image(path))
+    return base64.b64encode(data).decode("utf-8"), mime
+
+
+def make_synthetic(folder, sample):
+    base = Image.open(sample).convert("RGB")
+    phone = base.resize((4000, 3000), Image.BICUBIC)
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotate 90° on display, as phones do
+    phone_path = os.path.join(folder, "synthetic_12mp.jpg")
+    phone.save(phone_path, quality=95, exif=exif)
+    png = base.resize((1600, 2400), Image.BICUBIC).convert("RGBA")
+    png.putalpha(230)
+    png_path = os.path.join(folder, "synthetic_alpha.png")
+    png.save(png_path)
+    return [phone_path, png_path]
+
+
+def measure(fn, path, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encoded, mime = fn(path)
+        times.append(time.perf_counter() - start)
+    return len(encoded), mime, times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = sorted(os.path.join(IMAGES_DIR, name) for name in os.listdir(IMAGES_DIR)
+                     if name.lower().endswith((".jpg", ".jpeg", ".png")))
+    with tempfile.TemporaryDirectory() as folder:
+        paths = samples + make_synthetic(folder, samples[0])
+        for path in paths:
+            with Image.open(path) as original:
+                size = original.size
+            old_bytes, _, old_times = measure(old_encode, path, args.repeat)
+            new_bytes, mime, new_times = measure(new_encode, path, args.repeat)
+            new_size = load_image(path).size
+            print(f"{os.path.basename(path)}  {size[0]}x{size[1]} -> {new_size[0]}x{new_size[1]} (before resize)  {mime}")
+            print(f"    upload: {old_bytes / 1024:8.1f} KiB -> {new_bytes / 1024:8.1f} KiB base64")
+            bench_utils.report("    raw base64", old_times)
+            bench_utils.report("    decode + encode", new_times)
+
+
+if __name__ == "__main__":
+    main()
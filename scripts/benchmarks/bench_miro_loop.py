@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Tick timing of the MiRo control loop: blocking blink and amixer calls against the animation engine.
+
+Runs a 50 Hz idle loop for --seconds with a blink every --blink-interval
+seconds and a listening toggle (mute/unmute) every --toggle-interval seconds.
+ROS publishing is replaced by a small busy wait; amixer is the real command
+when it is installed, otherwise a sleep of about its cost. "old" blinks with
+a 0.5 s sleep and runs amixer inside the tick. "engine" does what
+run_miro_with_queue does now: every tick evaluates an AnimationEngine that
+plays the blink as a Clip, and amixer runs on the mic worker thread. Prints
+TickStats for both.
+"""
+import argparse
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bench_utils  # noqa: F401  (puts scripts/ on the path)
+
+from miro_animation import AnimationEngine, Behaviour, Clip
+from miro_scheduler import TickScheduler, TickStats
+
+PUBLISH_COST = 0.0002  # a few publishes per tick
+
+# Same shape as the idle behaviour and BLINK in miro_emotions.py, which needs rospy to import
+IDLE = Behaviour(oscillators={"wag": (0.5, 1.25)})
+BLINK = Clip([0.0, 0.05, 0.45, 0.5], {"eyelid_left": [0.0, 1.0, 1.0, 0.0], "eyelid_right": [0.0, 1.0, 1.0, 0.0]})
+
+
+def publish():
+    end = time.perf_counter() + PUBLISH_COST
+    while time.perf_counter() < end:
+        pass
+
+
+def amixer():
+    if shutil.which("amixer"):
+        subprocess.run(["amixer", "get", "Capture"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        time.sleep(0.008)
+
+
+def run(kind, seconds, blink_interval, toggle_interval):
+    stats = TickStats()
+    scheduler = TickScheduler(stats)
+    mic_worker = ThreadPoolExecutor(max_workers=1)
+    engine = AnimationEngine({"idle": IDLE})
+    start = time.monotonic()
+    engine.set_behaviour("idle", start)
+    last_blink = last_toggle = start
+    while time.monotonic() - start < seconds:
+        scheduler.begin_tick()
+        now = time.monotonic()
+        if kind != "old":
+            engine.evaluate(now)
+        publish()
+        if now - last_toggle >= toggle_interval:
+            last_toggle = now
+            if kind == "old":
+                amixer()
+                amixer()
+            else:
+                mic_worker.submit(amixer)
+                mic_worker.submit(amixer)
+        if now - last_blink >= blink_interval:
+            last_blink = now
+            if kind == "old":
+                publish()
+                time.sleep(0.5)
+                publish()
+            else:
+                engine.play(BLINK, now)
+        scheduler.end_tick()
+    mic_worker.shutdown()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--blink-interval", type=float, default=2.0)
+    parser.add_argument("--toggle-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    for kind in ("old", "engine"):
+        stats = run(kind, args.seconds, args.blink_interval, args.toggle_interval)
+        print(f"{kind}:")
+        print(stats.report())
+
+
+if __name__ == "__main__":
+    main()
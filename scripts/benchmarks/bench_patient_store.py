@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Launch-screen and profile-load latency of the PatientStore with hundreds of patients.
+
+Fills a temporary store with --patients profiles, each with a --pages page
+history, a few images with descriptions and some session outcomes, then times
+what the GUI does: opening the store and listing the names at launch, and
+loading one patient's SessionBundle when they are picked.
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import bench_utils
+from bench_history_ingest import SECTIONS, section_text
+
+from history_ingest import PatientHistory
+from patient_store import PatientStore
+
+
+def fill(store, patients, pages):
+    rng = random.Random(0)
+    history_pages = [f"{SECTIONS[n % len(SECTIONS)]}:\n" + section_text(SECTIONS[n % len(SECTIONS)], rng)
+                     for n in range(pages)]
+    preview = os.urandom(40 * 1024)  # about the size of a rendered first page
+    for number in range(patients):
+        patient_id = store.save_patient(f"Patient {number:04d}", {"image_type": "personal"})
+        store.save_history(patient_id, PatientHistory(f"/histories/{number}.pdf", f"{number:064x}", history_pages, preview))
+        for image in range(5):
+            path = f"/photos/{number}/{image}.jpg"
+            store.save_image(patient_id, path, section_text("FAVOURITE_MEMORIES", rng, 4))
+            store.record_outcome(patient_id, path, {"happy": random.randint(0, 6), "sad": random.randint(0, 2)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "patients.sqlite3")
+    try:
+        store = PatientStore(path)
+        start = time.perf_counter()
+        fill(store, args.patients, args.pages)
+        store.close()
+        print(f"Filled {args.patients} patients in {time.perf_counter() - start:.1f} s, "
+              f"store is {os.path.getsize(path) / 1024 / 1024:.1f} MiB")
+
+        launch = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            store = PatientStore(path)
+            store.list_patients()
+            launch.append(time.perf_counter() - start)
+            store.close()
+        bench_utils.report("open + list_patients", launch)
+
+        store = PatientStore(path)
+        ids = [patient_id for patient_id, _ in store.list_patients()]
+        loads = []
+        for _ in range(args.repeat):
+            patient_id = random.choice(ids)
+            start = time.perf_counter()
+            bundle = store.load_bundle(patient_id)
+            bundle.history.bounded_text()  # what the GUI does with it before a session can start
+            loads.append(time.perf_counter() - start)
+        bench_utils.report("load_bundle + bounded_text", loads)
+        store.close()
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
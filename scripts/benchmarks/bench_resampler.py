@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Real-time cost of the StreamResampler used between Daily (16 kHz) and MiRo's speaker stream (8 kHz).
+
+Resamples a minute of speech-band noise chunk by chunk and reports CPU time as a
+percentage of the audio duration (percent of one core in real time), plus a
+check that chunked output matches resampling the whole signal at once, and
+that a tone below both Nyquist frequencies comes out at the same frequency and
+amplitude, while a tone above the output's Nyquist frequency is filtered out
+instead of aliasing. Exits non-zero if a check fails.
+"""
+import argparse
+import time
+
+import numpy as np
+
+import bench_utils  # noqa: F401  (puts scripts/ on the path)
+import fake_audio
+
+fake_audio.install()  # the SDK package imports daily and pyaudio, not needed for the resampler
+
+from client_sdk_python_main.vapi_python.daily_call import (  # noqa: E402
+    CHUNK_SIZE, MIRO_SAMPLE_RATE, SAMPLE_RATE, StreamResampler)
+
+TONE_HZ = 1000.0
+TONE_AMPLITUDE = 8000
+
+
+def tone_check(in_rate, out_rate, chunk, tone_hz=TONE_HZ, seconds=1.0):
+    """Feed a tone_hz sine in chunks, return (frequency, amplitude) of the output's strongest component."""
+    t = np.arange(int(seconds * in_rate)) / in_rate
+    signal = (TONE_AMPLITUDE * np.sin(2 * np.pi * tone_hz * t)).astype(np.int16)
+    resampler = StreamResampler(in_rate, out_rate)
+    out = np.concatenate([resampler.process(signal[i:i + chunk]) for i in range(0, signal.size, chunk)])
+    out = out[resampler.taps:].astype(np.float64)  # skip the filter's start-up
+    spectrum = np.abs(np.fft.rfft(out * np.hanning(out.size)))
+    peak = int(np.argmax(spectrum))
+    frequency = peak * out_rate / out.size
+    amplitude = np.sqrt(2 * np.mean(out ** 2))  # RMS of a sine times sqrt(2)
+    return frequency, amplitude
+
+
+def run(in_rate, out_rate, seconds, chunk):
+    rng = np.random.default_rng(0)
+    signal = rng.normal(0, 4000, int(seconds * in_rate)).clip(-32768, 32767).astype(np.int16)
+    chunks = [signal[i:i + chunk] for i in range(0, signal.size, chunk)]
+
+    resampler = StreamResampler(in_rate, out_rate)
+    start = time.process_time()
+    out = [resampler.process(c) for c in chunks]
+    cpu = time.process_time() - start
+
+    whole = StreamResampler(in_rate, out_rate).process(signal)
+    matches = np.array_equal(np.concatenate(out), whole)
+    frequency, amplitude = tone_check(in_rate, out_rate, chunk)
+    tone_ok = abs(frequency - TONE_HZ) <= 2.0 and abs(amplitude / TONE_AMPLITUDE - 1) <= 0.02
+    if out_rate < in_rate:
+        # 0.75 x the output rate would alias to 0.25 x if it got through the filter
+        _, alias = tone_check(in_rate, out_rate, chunk, tone_hz=0.75 * out_rate)
+        tone_ok = tone_ok and alias / TONE_AMPLITUDE < 0.01
+    print(f"{in_rate:>6} -> {out_rate:<6} chunk={chunk:<5} {cpu / seconds * 100:6.3f}% of a core  "
+          f"{cpu / len(chunks) * 1e6:8.1f} us/chunk  taps/phase={resampler.taps}  chunked==whole: {matches}  "
+          f"tone {TONE_HZ:g} Hz -> {frequency:.1f} Hz at {amplitude / TONE_AMPLITUDE:.3f}x"
+          + (f", alias at {alias / TONE_AMPLITUDE:.4f}x" if out_rate < in_rate else "")
+          + f": {'OK' if tone_ok else 'FAIL'}")
+    return matches and tone_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    args = parser.parse_args()
+    results = [
+        run(SAMPLE_RATE, MIRO_SAMPLE_RATE, args.seconds, CHUNK_SIZE),
+        run(MIRO_SAMPLE_RATE, SAMPLE_RATE, args.seconds, CHUNK_SIZE // 2),
+        run(48000, MIRO_SAMPLE_RATE, args.seconds, 3840),
+    ]
+    raise SystemExit(0 if all(results) else 1)
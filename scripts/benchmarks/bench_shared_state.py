@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Read/write latency of the mode register: Manager().dict vs SharedModeState.
+
+Also checks that a write made in a child process is visible to the parent, and
+measures how long a mode change takes to wake a ModeSubscriber in another process.
+"""
+import argparse
+import time
+from multiprocessing import Manager, Process
+
+from bench_utils import report, time_call
+
+from shared_state import SharedModeState
+
+
+def child_writer(state):
+    state["current_mode"] = "happy"
+
+
+def child_toggler(state, count):
+    for i in range(count):
+        time.sleep(0.005)
+        state["current_mode"] = "happy" if i % 2 else "sad"
+
+
+def bench_notify(count):
+    state = SharedModeState()
+    events = state.subscribe()
+    proc = Process(target=child_toggler, args=(state, count))
+    proc.start()
+    latencies = []
+    while len(latencies) < count:
+        if events.wait(1.0):
+            events.drain()
+            latencies.append(time.time() - state.timestamp)
+    proc.join()
+    report("change -> subscriber wake", latencies)
+
+
+def bench(name, state, repeat):
+    read = time_call(lambda: state["current_mode"], repeat=repeat)
+    get = time_call(lambda: state.get("current_mode", "idle"), repeat=repeat)
+    write = time_call(lambda: state.__setitem__("current_mode", "sad"), repeat=repeat)
+    print(f"{name:<18} read={read * 1e9:10.0f} ns  get={get * 1e9:10.0f} ns  write={write * 1e9:10.0f} ns")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    with Manager() as manager:
+        bench("Manager().dict", manager.dict(current_mode="idle", agent_speaking=False), args.repeat)
+
+    state = SharedModeState()
+    bench("SharedModeState", state, args.repeat)
+
+    state["current_mode"] = "idle"
+    proc = Process(target=child_writer, args=(state,))
+    proc.start()
+    proc.join()
+    print(f"after child write: {state!r}, seq={state.seq}")
+
+    bench_notify(200)
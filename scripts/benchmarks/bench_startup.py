@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Startup cost of the GUI and of each child process, measured with ``python -X importtime``.
+
+For every entry point it starts a fresh interpreter, imports what that process
+imports at launch and reports the total import time plus the slowest top-level
+modules. For the GUI it also times how long until the first window is drawn
+(skipped when there is no display).
+
+  python scripts/benchmarks/bench_startup.py [--repeat 3] [--top 8]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+import bench_utils
+
+# What each process imports before it does any work
+ENTRY_POINTS = {
+    "gui (start_screen)": "import start_screen",
+    "api process": "import uvicorn, main",
+    "vapi process": "import vapi_therapist",
+    "miro process": "import miro_emotions",
+}
+
+FIRST_WINDOW = """
+import time
+t0 = time.perf_counter()
+import tkinter as tk
+import start_screen
+root = tk.Tk()
+app = start_screen.ReminiscenceTherapyGUI(root)
+root.update()
+print(time.perf_counter() - t0)
+root.destroy()
+"""
+
+
+def run_python(args):
+    return subprocess.run([sys.executable] + args, cwd=bench_utils.SCRIPTS_DIR,
+                          capture_output=True, text=True, env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"))
+
+
+def import_times(statement):
+    """Return ({top-level module: cumulative µs}, error line or None) for one fresh interpreter."""
+    result = run_python(["-X", "importtime", "-c", statement])
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        name = name[1:]  # one separator space, then nested imports are indented further
+        if not name.startswith(" ") and "." not in name:
+            # Nested imports are indented; a top-level module's cumulative time includes them
+            modules[name] = int(cumulative_us)
+    error = None
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1]
+    return modules, error
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    for name, statement in ENTRY_POINTS.items():
+        runs = [import_times(statement) for _ in range(args.repeat)]
+        error = runs[-1][1]
+        totals = [sum(modules.values()) / 1e6 for modules, _ in runs]
+        bench_utils.report(f"{name} imports", totals)
+        if error:
+            print(f"    (import failed here: {error})")
+        slowest = sorted(runs[-1][0].items(), key=lambda item: item[1], reverse=True)[:args.top]
+        for module, us in slowest:
+            print(f"    {module:<30} {us / 1000:8.1f} ms")
+
+    if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+        print("time to first window: skipped, no DISPLAY")
+        return
+    samples = []
+    for _ in range(args.repeat):
+        result = run_python(["-c", FIRST_WINDOW])
+        if result.returncode != 0:
+            print("time to first window: failed,", result.stderr.strip().splitlines()[-1])
+            return
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    bench_utils.report("time to first window", samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Small helpers shared by the benchmark scripts in this folder.
+
+Run the benchmarks from anywhere, e.g. ``python scripts/benchmarks/bench_webhook_latency.py``.
+Importing this module puts ``scripts/`` on the path so the benchmarks can import
+the same modules start_screen.py does.
+"""
+import os
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def report(name, samples_s):
+    """Print count/p50/p99/max of a list of durations given in seconds."""
+    ms = [s * 1000.0 for s in samples_s]
+    print(f"{name:<28} n={len(ms):<6} p50={percentile(ms, 50):9.3f} ms  "
+          f"p99={percentile(ms, 99):9.3f} ms  max={max(ms) if ms else float('nan'):9.3f} ms")
+
+
+def time_call(fn, *args, repeat=1000):
+    """Return the mean seconds per call of fn(*args) over `repeat` calls."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) / repeat
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Decode time and peak memory of webhook payloads: request.json() path vs decode_webhook_payload.
+
+Builds realistic conversation-update and end-of-call-report bodies (long
+conversations plus the artifact, transcript and per-message timing data Vapi
+attaches) and decodes each with json.loads (what Starlette's request.json()
+does), orjson and the msgspec schema when they are installed.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from bench_utils import percentile
+
+import main
+
+
+def build_payload(kind, turns):
+    conversation = [{"role": "system", "content": "You are a warm reminiscence therapist. " * 40}]
+    messages = []
+    for i in range(turns):
+        for role, text in (("assistant", f"Can you tell me more about the picnic {i}?"),
+                           ("user", f"We sat by the river and my father told stories, number {i}.")):
+            conversation.append({"role": role, "content": text})
+            messages.append({"role": "bot" if role == "assistant" else role, "message": text,
+                             "time": 1715600000000 + i * 1000, "endTime": 1715600000800 + i * 1000,
+                             "secondsFromStart": i * 1.5, "duration": 800, "source": "",
+                             "metadata": {"wordLevelConfidence": [0.98] * 12}})
+    message = {
+        "type": kind,
+        "timestamp": 1715600000000,
+        "call": {"id": "3b1a2e9c-0000-4000-8000-000000000000", "orgId": "org", "type": "webCall",
+                 "assistantId": "ba05d6d9-8f92-4065-b88b-ecef1ea39d69", "status": "in-progress"},
+        "assistant": {"name": "MiRo therapist", "model": {"provider": "openai", "model": "gpt-4o",
+                                                          "messages": conversation[:1]}},
+        "conversation": conversation,
+        "messages": messages,
+        "messagesOpenAIFormatted": conversation,
+    }
+    if kind == "end-of-call-report":
+        message["transcript"] = "\n".join(f"{e['role']}: {e['content']}" for e in conversation)
+        message["summary"] = "The patient talked about family picnics by the river. " * 20
+        message["artifact"] = {"messages": messages, "transcript": message["transcript"],
+                               "recordingUrl": "https://storage.vapi.ai/recording.wav"}
+    return json.dumps({"message": message}).encode()
+
+
+def measure(name, decode, body, repeat):
+    tracemalloc.start()
+    decode(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(body)
+        times.append(time.perf_counter() - start)
+    print(f"  {name:<24} p50={percentile(times, 50) * 1000:8.3f} ms  "
+          f"p99={percentile(times, 99) * 1000:8.3f} ms  peak={peak / 1024:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, nargs="*", default=[50, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    decoders = [("json.loads (current)", json.loads)]
+    if main.orjson is not None:
+        decoders.append(("orjson.loads", main.orjson.loads))
+    if main._webhook_decoder is not None:
+        decoders.append(("msgspec schema", main.decode_webhook_payload))
+    else:
+        print("msgspec not installed, decode_webhook_payload uses "
+              + ("orjson" if main.orjson is not None else "json"))
+
+    for kind in ("conversation-update", "end-of-call-report"):
+        for turns in args.turns:
+            body = build_payload(kind, turns)
+            print(f"{kind} turns={turns} body={len(body) / 1024:.0f} KiB")
+            for name, decode in decoders:
+                measure(name, decode, body, args.repeat)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Fire bursts of mixed Vapi webhook payloads at /vapi-webhook and report handler latency.
+
+The emotion classifier is replaced with a stub that sleeps for the given latency,
+so no OpenAI key or network is needed. speech-update events should stay well
+under a millisecond even while transcripts are being classified.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from bench_utils import report
+
+import httpx
+
+from main import create_app
+
+MESSAGES = ["I loved that holiday", "I miss my brother", "okay", "It was raining", "sure"]
+
+
+def make_stub_classifier(latency):
+    def classify(text):
+        time.sleep(latency)
+        return random.choice(["positive", "negative", "neutral"])
+    return classify
+
+
+def make_payload(kind, i):
+    if kind == "transcript":
+        return {"message": {"type": "transcript", "role": "user",
+                            "content": random.choice(MESSAGES) + f" {i}"}}
+    if kind == "speech-update":
+        return {"message": {"type": "speech-update", "role": "assistant",
+                            "status": random.choice(["started", "stopped"])}}
+    return {"message": {"type": "conversation-update", "conversation": [
+        {"role": "assistant", "content": "Tell me about this photo."},
+        {"role": "user", "content": random.choice(MESSAGES) + f" {i}"},
+    ]}}
+
+
+async def run(args):
+    shared_state = {"current_mode": "idle", "agent_speaking": False}
+    app = create_app(shared_state, classifier=make_stub_classifier(args.latency),
+                     max_concurrent_classifications=args.concurrency)
+    transport = httpx.ASGITransport(app=app)
+    latencies = {"transcript": [], "speech-update": [], "conversation-update": []}
+    kinds = list(latencies)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def send(kind, i):
+            start = time.perf_counter()
+            await client.post("/vapi-webhook", json=make_payload(kind, i))
+            latencies[kind].append(time.perf_counter() - start)
+
+        counter = 0
+        for _ in range(args.bursts):
+            jobs = []
+            for _ in range(args.burst_size):
+                counter += 1
+                jobs.append(send(random.choices(kinds, weights=[1, 3, 1])[0], counter))
+            await asyncio.gather(*jobs)
+
+    print(f"stub latency={args.latency * 1000:.0f} ms, concurrency={args.concurrency}, "
+          f"{args.bursts} bursts x {args.burst_size}")
+    for kind, samples in latencies.items():
+        report(kind, samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--burst-size", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.3, help="stub classifier latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Checks the Vapi client's pooled session against a local stand-in for the Vapi API.
+
+The stand-in answers POST /call/web like the real API (201 + id/webCallUrl) and
+counts TCP connections, so the script can check that:
+  - repeated calls from one Vapi client reuse a single keep-alive connection
+  - warm_up() opens the connection before start() needs it
+  - 503s are retried with backoff; 502s and read timeouts are not (the call may exist)
+  - the async variant behaves the same
+It also prints the per-call latency of a fresh requests.post against the pooled session.
+Exits non-zero if any check fails.
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import bench_utils  # noqa: F401  (puts scripts/ on the path)
+import fake_audio
+
+fake_audio.install()
+
+from client_sdk_python_main.vapi_python.vapi_python import (  # noqa: E402
+    Vapi, create_web_call, create_web_call_async)
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+    connections = 0
+    posts = 0
+    fail_next = 0      # answer this many POSTs with fail_status first
+    fail_status = 503
+    delay = 0.0        # seconds to sleep before answering a POST
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StandIn.lock:
+            StandIn.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b""):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client gave up (read timeout check)
+
+    def do_HEAD(self):
+        self._send(404)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with StandIn.lock:
+            StandIn.posts += 1
+            failing = StandIn.fail_next > 0
+            StandIn.fail_next -= failing
+        if StandIn.delay:
+            time.sleep(StandIn.delay)
+        if failing:
+            self._send(StandIn.fail_status, b'{"message": "busy"}')
+            return
+        body = json.dumps({"id": f"call-{StandIn.posts}", "webCallUrl": "https://example.daily.co/x"})
+        self._send(201, body.encode())
+
+
+def reset(fail_next=0, delay=0.0, fail_status=503):
+    StandIn.connections = StandIn.posts = 0
+    StandIn.fail_next = fail_next
+    StandIn.fail_status = fail_status
+    StandIn.delay = delay
+
+
+def check(name, ok, detail=""):
+    print(f"{'ok  ' if ok else 'FAIL'} {name} {detail}")
+    return ok
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_address[1]}"
+    payload = {"assistantId": "test"}
+    results = []
+
+    reset()
+    vapi = Vapi(api_key="test", api_url=api_url, backoff_factor=0.01)
+    pooled = []
+    for _ in range(20):
+        start = time.perf_counter()
+        create_web_call(api_url, "test", payload, session=vapi.session)
+        pooled.append(time.perf_counter() - start)
+    results.append(check("20 calls on one connection", StandIn.connections == 1, f"(connections={StandIn.connections})"))
+
+    reset()
+    bare = []
+    for _ in range(20):
+        start = time.perf_counter()
+        create_web_call(api_url, "test", payload)
+        bare.append(time.perf_counter() - start)
+    bench_utils.report("bare requests.post", bare)
+    bench_utils.report("pooled session", pooled)
+
+    reset()
+    vapi = Vapi(api_key="test", api_url=api_url, backoff_factor=0.01)
+    vapi.warm_up(background=True)
+    vapi.wait_for_warm_up()
+    warmed = StandIn.connections
+    create_web_call(api_url, "test", payload, session=vapi.session)
+    results.append(check("warm_up opens the connection start() uses",
+                         warmed == 1 and StandIn.connections == 1, f"(connections={StandIn.connections})"))
+
+    reset(fail_next=2)
+    call_id, _ = create_web_call(api_url, "test", payload, session=vapi.session)
+    results.append(check("503s are retried", StandIn.posts == 3 and call_id == "call-3", f"(posts={StandIn.posts})"))
+
+    reset(fail_next=10)
+    try:
+        create_web_call(api_url, "test", payload, session=vapi.session)
+        raised = False
+    except Exception as e:
+        raised = "busy" in str(e)
+    results.append(check("gives up after the retry budget", raised and StandIn.posts == 4, f"(posts={StandIn.posts})"))
+
+    reset(fail_next=1, fail_status=502)
+    try:
+        create_web_call(api_url, "test", payload, session=vapi.session)
+        raised = False
+    except Exception as e:
+        raised = "busy" in str(e)
+    results.append(check("502 is not retried", raised and StandIn.posts == 1, f"(posts={StandIn.posts})"))
+
+    reset(delay=0.5)
+    slow = Vapi(api_key="test", api_url=api_url, timeout=(1, 0.1))
+    start = time.perf_counter()
+    try:
+        create_web_call(api_url, "test", payload, session=slow.session, timeout=slow.timeout)
+        timed_out = False
+    except requests.RequestException:
+        timed_out = True
+    results.append(check("read timeout, not retried", timed_out and StandIn.posts == 1 and time.perf_counter() - start < 0.4,
+                         f"(posts={StandIn.posts})"))
+
+    async def run_async():
+        import httpx
+        async with httpx.AsyncClient() as client:
+            ids = [(await create_web_call_async(api_url, "test", payload, client, backoff_factor=0.01))[0]
+                   for _ in range(5)]
+        return ids
+
+    reset(fail_next=1)
+    ids = asyncio.run(run_async())
+    results.append(check("async variant retries and reuses its client",
+                         ids[0] == "call-2" and StandIn.connections == 1,
+                         f"(posts={StandIn.posts}, connections={StandIn.connections})"))
+
+    async def run_async_once():
+        try:
+            await create_web_call_async(api_url, "test", payload, backoff_factor=0.01)
+        except Exception as e:
+            return "busy" in str(e)
+        return False
+
+    reset(fail_next=1, fail_status=502)
+    raised = asyncio.run(run_async_once())
+    results.append(check("async variant does not retry a 502", raised and StandIn.posts == 1, f"(posts={StandIn.posts})"))
+
+    server.shutdown()
+    raise SystemExit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
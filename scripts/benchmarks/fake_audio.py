@@ -0,0 +1,165 @@
+"""Stand-ins for the ``daily`` and ``pyaudio`` modules so DailyCall can run without hardware.
+
+Call install() before importing anything from client_sdk_python_main. The fake
+speaker device produces a sine tone in real time (read_frames returns nothing
+until the next chunk is due, like the real device between packets), the fake
+microphone swallows frames, and fake PyAudio streams run their callback from a
+thread at the stream's real rate.
+"""
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+
+SPEAKER_TONE_HZ = 440.0
+
+
+class FakeMicrophone:
+    def __init__(self, name, sample_rate, channels):
+        self.name = name
+        self.frames_written = 0
+
+    def write_frames(self, frames):
+        self.frames_written += len(frames) // 2
+        return len(frames) // 2
+
+
+class FakeSpeaker:
+    """Real-time paced tone; returns b"" when the next chunk is not due yet."""
+
+    def __init__(self, name, sample_rate, channels):
+        self.name = name
+        self.sample_rate = sample_rate
+        self.started = None
+        self.frames_read = 0
+
+    def read_frames(self, num_frames):
+        now = time.perf_counter()
+        if self.started is None:
+            self.started = now
+        if (now - self.started) * self.sample_rate < self.frames_read + num_frames:
+            return b""
+        t = (self.frames_read + np.arange(num_frames)) / self.sample_rate
+        self.frames_read += num_frames
+        return (np.sin(2 * np.pi * SPEAKER_TONE_HZ * t) * 3000).astype(np.int16).tobytes()
+
+
+class Daily:
+    @staticmethod
+    def init():
+        pass
+
+    @staticmethod
+    def create_microphone_device(name, sample_rate, channels):
+        return FakeMicrophone(name, sample_rate, channels)
+
+    @staticmethod
+    def create_speaker_device(name, sample_rate, channels):
+        return FakeSpeaker(name, sample_rate, channels)
+
+    @staticmethod
+    def select_speaker_device(name):
+        pass
+
+
+class EventHandler:
+    pass
+
+
+class CallClient:
+    def __init__(self, event_handler=None):
+        self.handler = event_handler
+        self.app_messages = []
+
+    def update_inputs(self, inputs):
+        threading.Timer(0.01, self.handler.on_inputs_updated, args=(inputs,)).start()
+
+    def update_subscription_profiles(self, profiles):
+        pass
+
+    def participants(self):
+        return {"local": {"id": "local"}}
+
+    def join(self, url, completion=None):
+        if completion is not None:
+            threading.Timer(0.05, completion, args=(None, None)).start()
+
+    def leave(self):
+        pass
+
+    def send_app_message(self, msg):
+        self.app_messages.append(msg)
+
+
+paInt16 = 8
+paContinue = 0
+paComplete = 1
+paInputOverflow = 2
+
+
+class FakeStream:
+    """Runs stream_callback once per buffer at the stream's sample rate."""
+
+    def __init__(self, rate, channels, frames_per_buffer, input=False, output=False,
+                 stream_callback=None, start=True, **_):
+        self.period = frames_per_buffer / rate
+        self.frames = frames_per_buffer
+        self.input = input
+        self.callback = stream_callback
+        self.silence = bytes(frames_per_buffer * channels * 2)
+        self.callbacks = 0
+        self.late_callbacks = 0
+        self._stop = threading.Event()
+        self._thread = None
+        if start:
+            self.start_stream()
+
+    def start_stream(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        next_due = time.perf_counter()
+        while not self._stop.is_set():
+            next_due += self.period
+            in_data = self.silence if self.input else None
+            _, flag = self.callback(in_data, self.frames, {}, 0)
+            self.callbacks += 1
+            if flag != paContinue:
+                return
+            delay = next_due - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                self.late_callbacks += 1
+
+    def stop_stream(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def close(self):
+        self.stop_stream()
+
+
+class PyAudio:
+    def open(self, format=paInt16, channels=1, rate=16000, **kwargs):
+        return FakeStream(rate, channels, **kwargs)
+
+    def terminate(self):
+        pass
+
+
+def install():
+    """Register the fakes as ``daily`` and ``pyaudio`` in sys.modules."""
+    daily = types.ModuleType("daily")
+    for name in ("Daily", "EventHandler", "CallClient"):
+        setattr(daily, name, globals()[name])
+    pyaudio = types.ModuleType("pyaudio")
+    for name in ("PyAudio", "paInt16", "paContinue", "paComplete", "paInputOverflow"):
+        setattr(pyaudio, name, globals()[name])
+    sys.modules["daily"] = daily
+    sys.modules["pyaudio"] = pyaudio
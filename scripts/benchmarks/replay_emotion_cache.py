@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Replay a recorded Vapi webhook stream and count how often the classifier is called.
+
+Each user turn arrives as partial transcripts, a final transcript, again in every
+conversation-update and once more in the end-of-call-report. With partials
+debounced and the emotion cache in front of the classifier there should be
+exactly one classifier call per distinct (normalised) utterance. The stream is
+replayed twice: straight through, and with the patient pausing longer than the
+quiet window after the first words of each turn, where that partial is
+classified too. Exits non-zero if either count is off.
+"""
+import asyncio
+import sys
+
+from bench_utils import SCRIPTS_DIR  # noqa: F401  (puts scripts/ on the path)
+
+import httpx
+
+from main import create_app, normalize_utterance
+
+QUIET_WINDOW = 0.05  # shorter than TRANSCRIPT_QUIET_WINDOW to keep the replay quick
+PAUSE = 3 * QUIET_WINDOW
+
+USER_TURNS = [
+    "Okay.",
+    "That's my sister, Margaret. We went to Whitby every summer.",
+    "okay",
+    "I miss her a lot, she died in 2010.",
+    "Sure",
+    "I don't know.",
+    "We used to eat chips on the harbour wall!",
+    "I don't know",
+    "sure.",
+]
+
+
+def recorded_stream(pause=None):
+    """Webhook payloads in order. With pause, a float (seconds to wait) follows each turn's first partial."""
+    conversation = []
+    for i, text in enumerate(USER_TURNS):
+        conversation.append({"role": "assistant", "content": f"Question {i}?"})
+        yield {"message": {"type": "speech-update", "role": "assistant", "status": "started"}}
+        yield {"message": {"type": "speech-update", "role": "assistant", "status": "stopped"}}
+        words = text.split()
+        for n in range(1, len(words)):
+            yield {"message": {"type": "transcript", "role": "user", "transcriptType": "partial",
+                               "transcript": " ".join(words[:n])}}
+            if pause and n == 1:
+                yield pause
+        yield {"message": {"type": "transcript", "role": "user", "transcriptType": "final", "transcript": text}}
+        conversation.append({"role": "user", "content": text})
+        yield {"message": {"type": "conversation-update", "conversation": list(conversation)}}
+    yield {"message": {"type": "end-of-call-report", "conversation": list(conversation)}}
+
+
+async def replay(pause=None):
+    """Replay the stream, return the texts the classifier was called with and the cache stats."""
+    calls = []
+
+    def counting_classifier(text):
+        calls.append(text)
+        return "neutral"
+
+    app = create_app({"current_mode": "idle"}, classifier=counting_classifier, quiet_window=QUIET_WINDOW)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://replay") as client:
+        for payload in recorded_stream(pause):
+            if isinstance(payload, float):
+                await asyncio.sleep(payload)
+            else:
+                await client.post("/vapi-webhook", json=payload)
+        stats = (await client.get("/emotion-stats")).json()
+    return calls, stats
+
+
+async def main():
+    distinct = {normalize_utterance(t) for t in USER_TURNS}
+    paused_partials = {normalize_utterance(t.split()[0]) for t in USER_TURNS if len(t.split()) > 1}
+    failed = False
+    for label, pause, expected in (("no pause", None, len(distinct)),
+                                   (f"{PAUSE:g} s pause after a partial", PAUSE, len(distinct | paused_partials))):
+        calls, stats = await replay(pause)
+        print(f"{label}: user turns: {len(USER_TURNS)}  expected calls: {expected}  classifier calls: {len(calls)}")
+        print(f"  cache stats: {stats}")
+        if len(calls) != expected:
+            print(f"  FAIL: expected {expected} classifier calls, got {len(calls)}: {calls}")
+            failed = True
+    if failed:
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -2,11 +2,134 @@ import daily
 import threading
 import pyaudio
 import json
+import math
+import queue
+import time
+from collections import deque
 import numpy as np
 
-SAMPLE_RATE = 8000
+# Daily devices run at 16 kHz for better speech recognition, the copy sent to
+# MiRo's speaker stream is resampled to MIRO_SAMPLE_RATE
+SAMPLE_RATE = 16000
+MIRO_SAMPLE_RATE = 8000
 NUM_CHANNELS = 1
-CHUNK_SIZE = 640
+CHUNK_SIZE = SAMPLE_RATE * 80 // 1000  # 80 ms
+CHUNK_SECONDS = CHUNK_SIZE / SAMPLE_RATE
+
+# Chunks buffered in each direction between the sound card and Daily. When a
+# buffer is full the oldest chunk is dropped, so latency stays under ~0.5 s
+JITTER_CHUNKS = 6
+# How often the audio threads wake up to check whether the call is ending
+STOP_POLL_SECONDS = 0.1
+
+# Gain applied to the audio forwarded to the robot speaker
+SPEAKER_GAIN = 5.0
+# Above this fraction of full scale the soft limiter starts compressing instead of clipping
+SOFT_LIMIT_KNEE = 0.6
+
+
+def build_gain_table(gain, soft_limit=True, knee=SOFT_LIMIT_KNEE):
+    """Lookup table mapping every int16 sample (indexed as uint16) to its output after gain.
+
+    Without soft_limit the output is hard clipped, exactly like
+    clip(x * gain, -32768, 32767). With it, anything above knee (fraction of full
+    scale) is squashed with tanh so loud speech bends smoothly instead of clipping.
+    """
+    x = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.float64)
+    y = x * gain
+    if soft_limit:
+        full_scale = 32767.0
+        threshold = knee * full_scale
+        over = np.abs(y) > threshold
+        headroom = full_scale - threshold
+        y[over] = np.sign(y[over]) * (threshold + headroom * np.tanh((np.abs(y[over]) - threshold) / headroom))
+    return np.clip(np.rint(y), -32768, 32767).astype(np.int16)
+
+
+class GainStage:
+    """Applies gain (and optionally a soft limiter) to int16 PCM with one table lookup per sample.
+
+    The table and the buffers are built once, so process() allocates no new arrays.
+    The returned array is a view of the internal buffer and is overwritten by the
+    next call, so consumers must copy it before then (AudioRing.put does).
+    """
+
+    def __init__(self, gain=SPEAKER_GAIN, soft_limit=True, knee=SOFT_LIMIT_KNEE, chunk_size=CHUNK_SIZE):
+        self.gain = gain
+        self.soft_limit = soft_limit
+        self.table = build_gain_table(gain, soft_limit, knee)
+        self._resize(chunk_size)
+
+    def _resize(self, size):
+        self.index = np.empty(size, dtype=np.intp)
+        self.out = np.empty(size, dtype=np.int16)
+
+    def process(self, buf):
+        samples = np.frombuffer(buf, dtype=np.uint16)
+        n = samples.size
+        if n > self.out.size:
+            self._resize(n)
+        index = self.index[:n]
+        out = self.out[:n]
+        # take() would convert uint16 indices to intp in a temporary, so convert into our own buffer.
+        # mode="wrap" lets take() write straight into out (every uint16 is a valid index anyway)
+        np.copyto(index, samples)
+        np.take(self.table, index, out=out, mode="wrap")
+        return out
+
+
+class StreamResampler:
+    """Polyphase resampler for int16 PCM delivered in chunks.
+
+    Converts in_rate to out_rate with a windowed-sinc low-pass filter split into
+    phases, so only the output samples are ever computed. The last input samples
+    and the output position carry over between chunks, so chunked output matches
+    resampling the whole signal at once.
+    """
+
+    def __init__(self, in_rate, out_rate, taps_per_phase=None):
+        g = math.gcd(in_rate, out_rate)
+        self.up = out_rate // g
+        self.down = in_rate // g
+        if taps_per_phase is None:
+            taps_per_phase = 16 * max(1, -(-self.down // self.up))
+        self.taps = taps_per_phase
+
+        # Low-pass at the lower of the two Nyquist frequencies, designed at the upsampled rate
+        n = self.up * self.taps
+        cutoff = 0.5 / max(self.up, self.down) * 0.9  # cycles per upsampled sample, with a little margin
+        t = np.arange(n) - (n - 1) / 2.0
+        h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n, 8.0)
+        h *= self.up / h.sum()
+        # phases[p, j] = h[p + j * up]
+        self.phases = h.reshape(self.taps, self.up).T.copy()
+        self._offsets = np.arange(self.taps)
+
+        self.history = np.zeros(self.taps - 1, dtype=np.float64)
+        self.in_count = 0   # input samples received so far
+        self.out_count = 0  # output samples produced so far
+
+    def process(self, samples):
+        """Resample one chunk (int16 array or bytes), returns the int16 output available so far."""
+        if isinstance(samples, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        buf = np.concatenate((self.history, samples))
+        base = self.in_count - (self.taps - 1)  # input index of buf[0]
+        self.in_count += samples.size
+
+        # Output n needs input floor(n * down / up), which must have arrived
+        end = (self.in_count * self.up - 1) // self.down + 1
+        positions = np.arange(self.out_count, end, dtype=np.int64) * self.down
+        self.out_count = end
+
+        phase = positions % self.up
+        newest = positions // self.up - base
+        window = buf[newest[:, None] - self._offsets[None, :]]
+        out = np.einsum("ij,ij->i", self.phases[phase], window)
+
+        self.history = buf[buf.size - (self.taps - 1):]
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
 
 def is_playable_speaker(participant):
     info = participant.get("info", {})
@@ -18,16 +141,37 @@ def is_playable_speaker(participant):
     )
 
 class DailyCall(daily.EventHandler):
-    def __init__(self, audio_queue):
+    def __init__(self, audio_queue, speaker_gain=SPEAKER_GAIN, soft_limit=True, jitter_chunks=JITTER_CHUNKS):
         self.audio_queue = audio_queue
+        self.resampler = StreamResampler(SAMPLE_RATE, MIRO_SAMPLE_RATE) if SAMPLE_RATE != MIRO_SAMPLE_RATE else None
+        self.gain_stage = GainStage(speaker_gain, soft_limit)
         daily.Daily.init()
         self.audio = pyaudio.PyAudio()
 
-        # PyAudio setup
+        # Bounded jitter buffers between the PyAudio callbacks and the Daily threads
+        self.mic_buffer = queue.Queue(maxsize=jitter_chunks)
+        self.playback_buffer = deque(maxlen=jitter_chunks)
+        self.silence = bytes(CHUNK_SIZE * NUM_CHANNELS * 2)
+        self.counters = {
+            "mic_chunks": 0,
+            "mic_overruns": 0,           # mic chunks dropped because Daily was not keeping up
+            "mic_device_overflows": 0,   # reported by PortAudio
+            "speaker_chunks": 0,
+            "speaker_empty_reads": 0,    # Daily had no speaker audio ready
+            "playback_overruns": 0,      # speaker chunks dropped because playback was behind
+            "playback_underruns": 0,     # playback callback found nothing to play
+            "send_cpu_seconds": 0.0,
+            "recv_cpu_seconds": 0.0,
+        }
+
+        # PyAudio setup, callback mode so no thread ever blocks on the sound card.
+        # The streams are started once the call is joined
         self.input_stream = self.audio.open(format=pyaudio.paInt16, channels=NUM_CHANNELS,
-                                            rate=SAMPLE_RATE, input=True, frames_per_buffer=CHUNK_SIZE)
+                                            rate=SAMPLE_RATE, input=True, frames_per_buffer=CHUNK_SIZE,
+                                            stream_callback=self._on_mic_audio, start=False)
         self.output_stream = self.audio.open(format=pyaudio.paInt16, channels=NUM_CHANNELS,
-                                             rate=SAMPLE_RATE, output=True, frames_per_buffer=CHUNK_SIZE)
+                                             rate=SAMPLE_RATE, output=True, frames_per_buffer=CHUNK_SIZE,
+                                             stream_callback=self._on_playback_audio, start=False)
 
         self.mic_dev = daily.Daily.create_microphone_device("my-mic", sample_rate=SAMPLE_RATE, channels=NUM_CHANNELS)
         self.spk_dev = daily.Daily.create_speaker_device("my-spk", sample_rate=SAMPLE_RATE, channels=NUM_CHANNELS)
@@ -61,9 +205,12 @@ class DailyCall(daily.EventHandler):
         self.joined = False
         self.inputs_ready = False
         self.start_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.first_audio_event = threading.Event()  # set when the assistant is first heard
+        self.left = False
 
-        self.recv_thread = threading.Thread(target=self.recv_audio)
-        self.send_thread = threading.Thread(target=self.send_audio)
+        self.recv_thread = threading.Thread(target=self.recv_audio, name="daily-recv", daemon=True)
+        self.send_thread = threading.Thread(target=self.send_audio, name="daily-send", daemon=True)
         self.recv_thread.start()
         self.send_thread.start()
 
@@ -78,43 +225,112 @@ class DailyCall(daily.EventHandler):
     def join(self, url): self.client.join(url, completion=self.on_joined)
 
     def leave(self):
+        if self.left:
+            return
+        self.left = True
         self.quit = True
-        self.recv_thread.join()
-        self.send_thread.join()
+        self.stop_event.set()
+        self.start_event.set()  # wake the threads if the call never started
+
+        # Threads wake at least every STOP_POLL_SECONDS, so these joins are short
+        for thread in (self.recv_thread, self.send_thread):
+            if thread is not threading.current_thread():
+                thread.join(timeout=1.0)
+        for stream in (self.input_stream, self.output_stream):
+            try:
+                stream.stop_stream()
+                stream.close()
+            except Exception as e:
+                print("Audio stream close error:", e)
+        self.audio.terminate()
         self.client.leave()
 
+    def stats(self):
+        stats = dict(self.counters)
+        stats["mic_buffer_depth"] = self.mic_buffer.qsize()
+        stats["playback_buffer_depth"] = len(self.playback_buffer)
+        return stats
+
     def _maybe_start(self):
         if self.err or (self.inputs_ready and self.joined):
             self.start_event.set()
 
+    # PyAudio callbacks, run on PortAudio's thread so they must never block
+    def _on_mic_audio(self, in_data, frame_count, time_info, status):
+        if status & pyaudio.paInputOverflow:
+            self.counters["mic_device_overflows"] += 1
+        try:
+            self.mic_buffer.put_nowait(in_data)
+        except queue.Full:
+            # Daily is behind, drop the oldest chunk rather than grow the delay
+            self.counters["mic_overruns"] += 1
+            try:
+                self.mic_buffer.get_nowait()
+                self.mic_buffer.put_nowait(in_data)
+            except (queue.Empty, queue.Full):
+                pass
+        return None, pyaudio.paContinue
+
+    def _on_playback_audio(self, in_data, frame_count, time_info, status):
+        frame_bytes = frame_count * NUM_CHANNELS * 2
+        try:
+            buf = self.playback_buffer.popleft()
+        except IndexError:
+            self.counters["playback_underruns"] += 1
+            buf = self.silence[:frame_bytes]
+        if len(buf) < frame_bytes:
+            # PyAudio takes a short buffer as the end of the stream, pad it with silence instead
+            buf += bytes(frame_bytes - len(buf))
+        return buf, pyaudio.paContinue
+
     def send_audio(self):
         self.start_event.wait()
         if self.err:
             print("Mic error")
             return
-        while not self.quit:
-            buf = self.input_stream.read(CHUNK_SIZE, exception_on_overflow=False)
-            if buf:
-                self.mic_dev.write_frames(buf)
+        if self.stop_event.is_set():
+            return
+        self.input_stream.start_stream()
+        cpu_start = time.thread_time()
+        while not self.stop_event.is_set():
+            try:
+                buf = self.mic_buffer.get(timeout=STOP_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            self.mic_dev.write_frames(buf)
+            self.counters["mic_chunks"] += 1
+            self.counters["send_cpu_seconds"] = time.thread_time() - cpu_start
 
     def recv_audio(self):
         self.start_event.wait()
         if self.err:
             print("Speaker error")
             return
-        while not self.quit:
+        if self.stop_event.is_set():
+            return
+        self.output_stream.start_stream()
+        cpu_start = time.thread_time()
+        while not self.stop_event.is_set():
             buf = self.spk_dev.read_frames(CHUNK_SIZE)
             if not buf:
+                # Nothing ready yet, wait half a chunk instead of spinning
+                self.counters["speaker_empty_reads"] += 1
+                self.stop_event.wait(CHUNK_SECONDS / 2)
                 continue
-            self.output_stream.write(buf, CHUNK_SIZE)
+            self.counters["speaker_chunks"] += 1
+            if not self.first_audio_event.is_set() and any(buf):
+                self.first_audio_event.set()
 
-            # Gain boost + send to audio queue
-            gain = 5
-            samples = np.frombuffer(buf, dtype=np.int16).astype(np.float32) * gain
-            samples = np.clip(samples, -32768, 32767).astype(np.int16)
+            if len(self.playback_buffer) == self.playback_buffer.maxlen:
+                self.counters["playback_overruns"] += 1
+            self.playback_buffer.append(buf)
 
+            # Resample to MiRo's rate, gain boost + send to audio queue
             if self.audio_queue:
-                self.audio_queue.put(samples)
+                if self.resampler is not None:
+                    buf = self.resampler.process(buf)
+                self.audio_queue.put(self.gain_stage.process(buf))
+            self.counters["recv_cpu_seconds"] = time.thread_time() - cpu_start
 
     def send_app_message(self, msg):
         try:
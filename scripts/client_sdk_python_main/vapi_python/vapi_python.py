@@ -1,32 +1,149 @@
 from daily import *
+import asyncio
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .daily_call import DailyCall
 
 SAMPLE_RATE = 16000
 CHANNELS = 1
 
-
-def create_web_call(api_url, api_key, payload):
+# (connect, read) timeouts in seconds for calls to the Vapi API, a single number sets both
+DEFAULT_TIMEOUT = (3.05, 15)
+# Retries for connection errors and the statuses below, with exponential backoff
+# (backoff_factor * 2 ** attempt seconds between attempts). Only failures where the
+# call was certainly not created are retried: the request never got sent (connect
+# errors), or was refused (429, 503). Read timeouts and 500/502/504 are not, the
+# API may already have created the call and a retry would create a second one
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.3
+RETRY_STATUSES = (429, 503)
+
+
+def make_session(retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF, pool_maxsize=4):
+    """requests.Session with a keep-alive connection pool and retry/backoff on the Vapi API."""
+    retry_kwargs = dict(total=retries, connect=retries, read=0, status=retries,
+                        backoff_factor=backoff_factor, status_forcelist=RETRY_STATUSES,
+                        raise_on_status=False)
+    try:
+        retry = Retry(allowed_methods=frozenset({"HEAD", "GET", "POST"}), **retry_kwargs)
+    except TypeError:
+        # urllib3 < 1.26
+        retry = Retry(method_whitelist=frozenset({"HEAD", "GET", "POST"}), **retry_kwargs)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=pool_maxsize)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _web_call_request(api_url, api_key):
     url = f"{api_url}/call/web"
     headers = {
         'Authorization': 'Bearer ' + api_key,
         'Content-Type': 'application/json'
     }
-    response = requests.post(url, headers=headers, json=payload)
-    data = response.json()
-    if response.status_code == 201:
+    return url, headers
+
+
+def _parse_web_call(status_code, data):
+    if status_code == 201:
         call_id = data.get('id')
         web_call_url = data.get('webCallUrl')
         return call_id, web_call_url
     else:
-        raise Exception(f"Error: {data['message']}")
+        raise Exception(f"Error: {data.get('message', status_code)}")
+
+
+def _json_or_empty(response):
+    try:
+        return response.json()
+    except ValueError:
+        return {}
+
+
+def _split_timeout(timeout):
+    return timeout if isinstance(timeout, tuple) else (timeout, timeout)
+
+
+def create_web_call(api_url, api_key, payload, session=None, timeout=DEFAULT_TIMEOUT):
+    url, headers = _web_call_request(api_url, api_key)
+    response = (session or requests).post(url, headers=headers, json=payload, timeout=timeout)
+    return _parse_web_call(response.status_code, _json_or_empty(response))
+
+
+async def create_web_call_async(api_url, api_key, payload, client=None, timeout=DEFAULT_TIMEOUT,
+                                retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF):
+    """Async version of create_web_call on an httpx.AsyncClient, with the same retry policy.
+
+    Pass a long-lived client to reuse its connection pool; without one a client is
+    opened just for this request.
+    """
+    import httpx
+
+    if client is None:
+        connect, read = _split_timeout(timeout)
+        async with httpx.AsyncClient(timeout=httpx.Timeout(read, connect=connect)) as client:
+            return await create_web_call_async(api_url, api_key, payload, client, timeout, retries, backoff_factor)
+
+    url, headers = _web_call_request(api_url, api_key)
+    for attempt in range(retries + 1):
+        try:
+            response = await client.post(url, headers=headers, json=payload)
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            # Same as the sync session: only when the request cannot have reached the API
+            if attempt == retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return _parse_web_call(response.status_code, _json_or_empty(response))
+        await asyncio.sleep(backoff_factor * (2 ** attempt))
 
 
 class Vapi:
-    def __init__(self, *, api_key, api_url="https://api.vapi.ai", daily_client=None):
+    def __init__(self, *, api_key, api_url="https://api.vapi.ai", daily_client=None, session=None,
+                 timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF):
         self.api_key = api_key
         self.api_url = api_url
+        self.timeout = timeout
+        # One pooled session per client so DNS/TCP/TLS are paid once, not per call
+        self.session = session or make_session(retries, backoff_factor)
         self.__client = daily_client  # store externally passed client
+        self._warm_thread = None
+
+    def warm_up(self, background=False):
+        """Open the connection to the API ahead of start() so the call creation does not pay for it.
+
+        With background=True it runs on a daemon thread and returns immediately;
+        start() waits for it to finish. Otherwise returns the seconds it took.
+        Failures are only logged, start() will simply connect again.
+        """
+        if background:
+            self._warm_thread = threading.Thread(target=self.warm_up, name="vapi-warm-up", daemon=True)
+            self._warm_thread.start()
+            return None
+        started = time.perf_counter()
+        try:
+            self.session.head(self.api_url, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"[Vapi] Warm-up failed: {e}")
+        return time.perf_counter() - started
+
+    def wait_for_warm_up(self, timeout=None):
+        """Block until a background warm_up() has finished (or timeout seconds pass)."""
+        if self._warm_thread is not None:
+            self._warm_thread.join(timeout=timeout)
+            if not self._warm_thread.is_alive():
+                self._warm_thread = None
+
+    def set_daily_client(self, daily_client):
+        """Use an already initialised DailyCall for the next start()."""
+        self.__client = daily_client
+
+    def close(self):
+        self.session.close()
 
     def start(
         self,
@@ -49,8 +166,11 @@ class Vapi:
         else:
             raise Exception("Error: No assistant specified.")
 
+        # Share the warmed connection instead of racing it with a second one
+        self.wait_for_warm_up(timeout=_split_timeout(self.timeout)[0])
+
         call_id, web_call_url = create_web_call(
-            self.api_url, self.api_key, payload)
+            self.api_url, self.api_key, payload, session=self.session, timeout=self.timeout)
 
         if not web_call_url:
             raise Exception("Error: Unable to create call.")
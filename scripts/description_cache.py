@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""On-disk cache of image descriptions, so a photo is only sent to the vision model once.
+
+Entries are keyed by image_description.description_key(): a hash of the image
+file plus the model, prompt and preprocessing settings, so changing any of
+those simply misses. The cache is a single SQLite file. When it grows past
+max_bytes the least recently used descriptions are evicted.
+
+Command line:
+  python description_cache.py warm <folder>   describe every photo in a folder ahead of a session
+  python description_cache.py stats
+  python description_cache.py clear
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "MIRO_DESCRIPTION_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "miro_therapy", "descriptions.sqlite3"),
+)
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024  # ~8000 descriptions
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS descriptions (
+    key TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    source TEXT,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS descriptions_last_used ON descriptions (last_used);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+
+class DescriptionCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Used from the description worker threads, so one connection behind a lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached description for key, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT description FROM descriptions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                self._count("misses")
+                return None
+            self.hits += 1
+            self._count("hits")
+            self._db.execute("UPDATE descriptions SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key, description, source=None):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO descriptions (key, description, size, source, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, description, len(description.encode("utf-8")), source, now, now),
+            )
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM descriptions")
+            self._db.execute("DELETE FROM counters")
+        self.hits = self.misses = 0
+
+    def stats(self):
+        """Entry count, size and hit rates, for this process and over the cache's lifetime."""
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM descriptions").fetchone()
+            totals = dict(self._db.execute("SELECT name, value FROM counters").fetchall())
+        lifetime_hits, lifetime_misses = totals.get("hits", 0), totals.get("misses", 0)
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / max(1, self.hits + self.misses),
+            "lifetime_hits": lifetime_hits,
+            "lifetime_misses": lifetime_misses,
+            "lifetime_hit_rate": lifetime_hits / max(1, lifetime_hits + lifetime_misses),
+            "evictions": totals.get("evictions", 0),
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _count(self, name, n=1):
+        self._db.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, n))
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM descriptions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        # Oldest first, through the last_used index, until back under the limit
+        for key, size in self._db.execute("SELECT key, size FROM descriptions ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM descriptions WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._count("evictions", evicted)
+
+
+def print_stats(cache):
+    stats = cache.stats()
+    print(f"[DescriptionCache] {cache.path}")
+    print(f"  entries={stats['entries']} size={stats['bytes'] / 1024:.1f}/{stats['max_bytes'] / 1024:.0f} KiB "
+          f"evictions={stats['evictions']}")
+    print(f"  lifetime hits={stats['lifetime_hits']} misses={stats['lifetime_misses']} "
+          f"hit rate={stats['lifetime_hit_rate']:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Image description cache")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    warm = commands.add_parser("warm", help="describe every photo in a folder ahead of a session (see album_batch.py)")
+    warm.add_argument("folder")
+    commands.add_parser("stats")
+    commands.add_parser("clear")
+    args = parser.parse_args()
+
+    cache = DescriptionCache(args.cache)
+    if args.command == "warm":
+        from album_batch import describe_album
+        print(f"[DescriptionCache] Warm-up: {describe_album(args.folder, cache)}")
+    elif args.command == "clear":
+        cache.clear()
+    print_stats(cache)
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
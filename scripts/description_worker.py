@@ -0,0 +1,139 @@
+"""Runs image descriptions off the Tk main thread.
+
+Jobs run on a small thread pool and stream their text into a queue. The Tk
+side drains that queue from root.after(), so every callback runs on the main
+thread. Submitting a new image cancels the job it replaces, and anything the
+old job still produces is dropped. With a DescriptionCache, photos that were
+described before come back straight from the cache.
+"""
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_MS = 50  # how often the Tk side drains finished tokens
+
+
+class DescriptionJob:
+    def __init__(self, job_id, image_path, on_token=None, on_done=None, on_error=None, image=None):
+        self.id = job_id
+        self.image_path = image_path
+        self.image = image
+        self.on_token = on_token
+        self.on_done = on_done
+        self.on_error = on_error
+        self.parts = []
+        self.finished = False
+        self.cached = False
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+
+class DescriptionWorker:
+    def __init__(self, root, max_workers=2, poll_ms=POLL_MS, cache=None):
+        self.root = root
+        self.cache = cache
+        self.poll_ms = poll_ms
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="describe")
+        self._events = queue.Queue()
+        self._ids = itertools.count(1)
+        self._pending = 0
+        self._after_id = None
+        self._closed = False
+        self.current = None
+
+    def submit(self, image_path, on_token=None, on_done=None, on_error=None, image=None):
+        """Describe image_path in the background, cancelling the job it replaces.
+
+        image is the already decoded load_image() result, if the caller has one.
+        on_token(delta), on_done(job) and on_error(exc) are called on the Tk thread.
+        """
+        if self.current is not None:
+            self.current.cancel()
+        job = DescriptionJob(next(self._ids), image_path, on_token, on_done, on_error, image)
+        self.current = job
+        self._pending += 1
+        self._pool.submit(self._run, job)
+        self._schedule()
+        return job
+
+    def cancel(self):
+        """Cancel the current job, its remaining output is discarded."""
+        if self.current is not None:
+            self.current.cancel()
+            self.current = None
+
+    def busy(self):
+        return self.current is not None and not self.current.finished
+
+    def shutdown(self):
+        self._closed = True
+        if self.current is not None:
+            self.current.cancel()
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._pool.shutdown(wait=False)
+
+    def _run(self, job):
+        # Worker thread: never touch Tk from here
+        try:
+            from image_description import ImageDescriber, description_key
+            key = None
+            if self.cache is not None:
+                key = description_key(job.image_path)
+                description = self.cache.get(key)
+                if description is not None:
+                    job.cached = True
+                    self._events.put((job, "token", description))
+                    self._events.put((job, "done", None))
+                    return
+
+            describer = ImageDescriber(image_path=job.image_path, describe=False, image=job.image)
+            parts = []
+            for delta in describer.stream_image_description(cancelled=lambda: job.cancelled):
+                parts.append(delta)
+                self._events.put((job, "token", delta))
+            if key is not None and not job.cancelled:
+                self.cache.put(key, "".join(parts), source=job.image_path)
+            self._events.put((job, "done", None))
+        except Exception as e:
+            self._events.put((job, "error", e))
+
+    def _schedule(self):
+        if self._after_id is None and not self._closed:
+            self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._after_id = None
+        while True:
+            try:
+                job, kind, value = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind != "token":
+                job.finished = True
+                self._pending -= 1
+            if job.cancelled:
+                continue  # a newer image replaced this one
+            if kind == "token":
+                job.parts.append(value)
+                if job.on_token:
+                    job.on_token(value)
+            elif kind == "done":
+                if job.on_done:
+                    job.on_done(job)
+            elif job.on_error:
+                job.on_error(value)
+        if self._pending:
+            self._schedule()
@@ -0,0 +1,149 @@
+"""BM25 index over a patient's history, so the assistant gets the passages that matter for this photo.
+
+The history is split into sections (see history_ingest.split_sections) and
+each section into passages of a few sentences. At session start
+context_for(image_description) returns the sections that must always be sent
+(name, topics to avoid, cognitive notes, ...) plus the best matching passages,
+within a character budget. Built and queried locally, no network needed.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+from history_ingest import split_sections
+
+# Characters of history passed at session start (~600 tokens)
+RETRIEVAL_CHAR_BUDGET = 2400
+PASSAGE_CHARS = 400
+# Mid-call a passage needs at least this BM25 score to be sent, so "okay" or "I don't know" sends nothing
+MIN_TOPIC_SCORE = 1.0
+# Sections sent whatever the photo shows, matched against the words of the section title
+PINNED_SECTIONS = ("NAME", "AGE", "AVOID", "COGNITIVE", "LANGUAGE", "TONE")
+# Share of the budget pinned sections may take, the rest is kept for passages about the photo
+PINNED_SHARE = 0.5
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?\"])\s+")
+_STOPWORDS = frozenset("""
+a an and are as at be but by for from had has have he her his i in is it its of on or our she that the their them
+they this to was were with you your who what when where which while would will there these those than then so
+""".split())
+
+
+def _stem(word):
+    # Just enough stemming that "gardening" finds "garden" and "bells" finds "bell"
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text):
+    return [_stem(word) for word in _WORD.findall(text.lower()) if word not in _STOPWORDS and len(word) > 1]
+
+
+def approx_tokens(text):
+    """Rough model token count (~4 characters per token for English)."""
+    return (len(text) + 3) // 4
+
+
+class Passage:
+    def __init__(self, section, text):
+        self.section = section
+        self.text = text
+
+    def __str__(self):
+        return f"{self.section}: {self.text}"
+
+
+def split_passages(sections, max_chars=PASSAGE_CHARS):
+    passages = []
+    for section, body in sections.items():
+        current = ""
+        for sentence in _SENTENCE_END.split(body):
+            if current and len(current) + len(sentence) + 1 > max_chars:
+                passages.append(Passage(section, current))
+                current = ""
+            current = f"{current} {sentence}".strip()
+        if current:
+            passages.append(Passage(section, current))
+    return passages
+
+
+class HistoryIndex:
+    def __init__(self, passages, k1=1.5, b=0.75):
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)  # term -> [(passage number, term frequency)]
+        self.lengths = []
+        for number, passage in enumerate(passages):
+            # The section title counts as part of the passage, "FAMILY" should find family passages
+            terms = Counter(tokenize(f"{passage.section} {passage.text}"))
+            self.lengths.append(sum(terms.values()))
+            for term, count in terms.items():
+                self.postings[term].append((number, count))
+        self.average_length = sum(self.lengths) / max(1, len(self.lengths))
+        n = len(passages)
+        self.idf = {term: math.log(1 + (n - len(posts) + 0.5) / (len(posts) + 0.5))
+                    for term, posts in self.postings.items()}
+
+    @classmethod
+    def from_text(cls, history_text, max_chars=PASSAGE_CHARS):
+        return cls(split_passages(split_sections(history_text), max_chars))
+
+    def search(self, query, k=5):
+        """Return [(score, Passage)] for the k best matching passages, best first."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for number, count in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[number] / self.average_length)
+                scores[number] += idf * count * (self.k1 + 1) / (count + norm)
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(score, self.passages[number]) for number, score in best]
+
+    def pinned(self):
+        return [p for p in self.passages if set(re.findall(r"[A-Z]+", p.section.upper())) & set(PINNED_SECTIONS)]
+
+    def context_for(self, query, budget=RETRIEVAL_CHAR_BUDGET, exclude=(), fill=False, pinned=True, min_score=0.0):
+        """Pinned sections plus the passages most relevant to query, in history order, within budget characters.
+
+        Only passages scoring above min_score for query are matches. With fill
+        (session start) what budget is left is filled with the other passages in
+        history order, so a photo that shares no words with the history still gets
+        some of it and a history that fits the budget is sent whole. pinned=False
+        leaves the pinned sections out (mid-call they were sent at the start),
+        otherwise they take at most PINNED_SHARE of the budget.
+        Returns (text, passages used). Passages in exclude (e.g. already sent) are skipped.
+        """
+        chosen = []
+        skip = {id(p) for p in exclude}
+        used = 0
+        candidates = []
+        if pinned:
+            # A long AVOID_TOPICS section must not crowd out the passages about the photo
+            pinned_budget = budget * PINNED_SHARE
+            for passage in self.pinned():
+                size = len(str(passage)) + 1
+                if id(passage) not in skip and size <= pinned_budget:
+                    candidates.append(passage)
+                    pinned_budget -= size
+        candidates += [p for score, p in self.search(query, k=len(self.passages)) if score > min_score]
+        if fill:
+            candidate_ids = {id(p) for p in candidates}
+            candidates += [p for p in self.passages if id(p) not in candidate_ids]
+        for passage in candidates:
+            if id(passage) in skip:
+                continue
+            size = len(str(passage)) + 1
+            if used + size > budget:
+                continue  # a long passage should not stop shorter ones fitting
+            chosen.append(passage)
+            skip.add(id(passage))
+            used += size
+        order = {id(p): i for i, p in enumerate(self.passages)}
+        chosen.sort(key=lambda p: order[id(p)])
+        return "\n".join(str(p) for p in chosen), chosen
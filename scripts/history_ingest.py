@@ -0,0 +1,151 @@
+"""Reads a patient history PDF once: every page's text, a preview of page 0, and a sectioned summary.
+
+The extracted pages and the preview PNG are cached on disk by the file's hash,
+so loading the same history again does not touch the PDF. The history is split
+into sections on its headings (PATIENT_NAME:, FAMILY_MEMBERS:, Childhood, ...)
+and bounded_text() trims the longest sections first so the whole history fits
+the assistant's variable budget while short sections (topics to avoid,
+cognitive notes) are always kept whole.
+"""
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "MIRO_HISTORY_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "miro_therapy", "history"),
+)
+# Characters of history passed to the assistant (~1500 tokens)
+HISTORY_CHAR_BUDGET = 6000
+PREVIEW_SIZE = (500, 400)
+_CACHE_VERSION = 1
+
+# "FAMILY_MEMBERS: [..." or "Work and career:" or a short line on its own like "CHILDHOOD"
+_HEADING = re.compile(r"^\s*([A-Z][A-Za-z_ &/'-]{1,40}?)\s*:\s*(.*)$")
+_BARE_HEADING = re.compile(r"^\s*([A-Z][A-Z_ &/'-]{2,40})\s*$")
+_INVISIBLE = re.compile("[\u200b\u200c\u200d\ufeff]")  # zero-width characters left by word processors
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as pdf_file:
+        for chunk in iter(lambda: pdf_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def clean_text(text):
+    text = _INVISIBLE.sub("", text)
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def split_sections(text):
+    """Split history text into an OrderedDict of heading -> body. Text before any heading goes under "History"."""
+    sections = OrderedDict()
+    title = "History"
+    for line in text.splitlines():
+        match = _HEADING.match(line) or _BARE_HEADING.match(line)
+        if match and len(match.group(1).split()) <= 5:
+            title = match.group(1).strip()
+            rest = match.group(2).strip() if match.lastindex and match.lastindex > 1 else ""
+            sections.setdefault(title, [])
+            if rest:
+                sections[title].append(rest)
+        else:
+            sections.setdefault(title, []).append(line)
+    return OrderedDict((title, " ".join(lines)) for title, lines in sections.items() if lines)
+
+
+def _trim(text, limit):
+    if len(text) <= limit:
+        return text
+    cut = text[:max(0, limit - 1)]
+    # Prefer ending on a sentence or list item rather than mid-word
+    for mark in (". ", "\", ", ", ", " "):
+        end = cut.rfind(mark)
+        if end > limit // 2:
+            cut = cut[:end + 1]
+            break
+    return cut.rstrip() + "…"
+
+
+def bound_sections(sections, budget=HISTORY_CHAR_BUDGET):
+    """Trim sections so "TITLE: body" lines fit budget, shortest sections kept whole (water-filling)."""
+    overhead = {title: len(title) + 3 for title in sections}  # "TITLE: " + newline
+    remaining = budget - sum(overhead.values())
+    limits = {}
+    pending = sorted(sections, key=lambda title: len(sections[title]))
+    while pending:
+        share = max(0, remaining // len(pending))
+        title = pending[0]
+        if len(sections[title]) <= share:
+            limits[title] = len(sections[title])
+            remaining -= limits[title]
+            pending.pop(0)
+        else:
+            # Everything left is longer than an equal share, split what remains evenly
+            for title in pending:
+                limits[title] = share
+            break
+    return OrderedDict((title, _trim(body, limits[title])) for title, body in sections.items() if limits[title] > 0)
+
+
+class PatientHistory:
+    def __init__(self, path, digest, pages, preview_png):
+        self.path = path
+        self.hash = digest
+        self.pages = pages
+        self.preview_png = preview_png
+        self.text = "\n".join(pages)
+        self.sections = split_sections(self.text)
+
+    @property
+    def page_count(self):
+        return len(self.pages)
+
+    def bounded_text(self, budget=HISTORY_CHAR_BUDGET):
+        """The sectioned history as "TITLE: body" lines, at most budget characters."""
+        return "\n".join(f"{title}: {body}" for title, body in bound_sections(self.sections, budget).items())
+
+
+def _render_preview(page, size=PREVIEW_SIZE):
+    import fitz  # PyMuPDF
+    # Rendered straight at thumbnail scale instead of full size then shrunk
+    scale = min(size[0] / page.rect.width, size[1] / page.rect.height, 1.0)
+    return page.get_pixmap(matrix=fitz.Matrix(scale, scale)).tobytes("png")
+
+
+def ingest_history(pdf_path, cache_dir=DEFAULT_CACHE_DIR):
+    """Return a PatientHistory for pdf_path, from the cache if this exact file was read before."""
+    digest = file_hash(pdf_path)
+    if cache_dir:
+        text_path = os.path.join(cache_dir, f"{digest}.json")
+        preview_path = os.path.join(cache_dir, f"{digest}.png")
+        try:
+            with open(text_path) as text_file:
+                cached = json.load(text_file)
+            with open(preview_path, "rb") as preview_file:
+                preview_png = preview_file.read()
+            if cached.get("version") == _CACHE_VERSION:
+                return PatientHistory(pdf_path, digest, cached["pages"], preview_png)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    # One open for both the text of every page and the preview
+    import fitz  # PyMuPDF, only needed when the history is not cached
+    with fitz.open(pdf_path) as doc:
+        pages = [clean_text(page.get_text()) for page in doc]
+        preview_png = _render_preview(doc[0]) if doc.page_count else b""
+
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(preview_path, "wb") as preview_file:
+            preview_file.write(preview_png)
+        tmp_path = text_path + ".tmp"
+        with open(tmp_path, "w") as text_file:
+            json.dump({"version": _CACHE_VERSION, "source": os.path.basename(pdf_path), "pages": pages}, text_file)
+        os.replace(tmp_path, text_path)  # written last, so a half-written entry is never read
+    return PatientHistory(pdf_path, digest, pages, preview_png)
@@ -1,35 +1,78 @@
 import base64
+import hashlib
 
-import openai
 from openai import OpenAI
 
+import image_prep
+from image_prep import encode_for_model, load_image
+
 CLIENT = OpenAI(api_key="")
 
+MODEL = "gpt-4.1-mini"
+PROMPT = "You are an AI assistant preparing conversational prompts for use in a reminiscence therapy session with an early-onset dementia patient. You are given an image and must describe it in a warm, accessible, and emotionally engaging way. Focus on familiar and evocative elements — such as settings from nature, architecture, objects, clothing, people, or activities — that may help the viewer recall meaningful memories or spark gentle, reflective conversation. Your response should be written in full sentences and structured to be passed into another AI model that will use it to guide a dialogue. Highlight specific visual details that could lead to storytelling (e.g., “a worn wooden bench,” “a group of people sharing a meal,” “a child flying a kite”), but do not ask any questions — only describe. Keep the tone positive, nostalgic, and grounded. Your output should feel like a kind narrator describing a photo for someone who may not be able to see it clearly, with the goal of helping them connect it to their own life experience."
+
+def description_key(image_path):
+    """Cache key for an image's description: its content, plus everything that changes the answer."""
+    content = hashlib.sha256()
+    with open(image_path, "rb") as image_file:
+        for chunk in iter(lambda: image_file.read(1 << 20), b""):
+            content.update(chunk)
+    settings = f"{MODEL}\n{PROMPT}\n{image_prep.MAX_LONG_SIDE}x{image_prep.MAX_SHORT_SIDE} q{image_prep.JPEG_QUALITY}"
+    return f"{content.hexdigest()}-{hashlib.sha256(settings.encode()).hexdigest()[:12]}"
+
 class ImageDescriber():
-    def __init__(self, image_path):
+    def __init__(self, image_path=None, describe=True, image=None, encoded=None):
+        # image: an already decoded load_image() result, so the file is not opened twice
+        # encoded: (bytes, mime type) from encode_for_model(), e.g. prepared in another process
         self.image_path = image_path
-        self.base64_image = self.encode_image()
+        if encoded is not None:
+            self.image = None
+            data, self.mime_type = encoded
+            self.base64_image = base64.b64encode(data).decode("utf-8")
+        else:
+            self.image = image if image is not None else load_image(image_path)
+            self.mime_type = "image/jpeg"
+            self.base64_image = self.encode_image()
 
-        self.response = self.create_image_description()
+        # describe=False leaves the request to stream_image_description()
+        self.response = self.create_image_description() if describe else None
 
     def encode_image(self):
-        with open(self.image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode("utf-8")
+        data, self.mime_type = encode_for_model(self.image)
+        return base64.b64encode(data).decode("utf-8")
+
+    def build_input(self):
+        return [{
+            "role": "user",
+            "content": [
+                {"type": "input_text", "text": PROMPT},
+                {
+                    "type": "input_image",
+                    "image_url": f"data:{self.mime_type};base64,{self.base64_image}",
+                },
+            ],
+        }]
 
     def create_image_description(self):
         response = CLIENT.responses.create(
-            model="gpt-4.1-mini",
-            input=[{
-                "role": "user",
-                "content": [
-                    {"type": "input_text",
-                     "text": "You are an AI assistant preparing conversational prompts for use in a reminiscence therapy session with an early-onset dementia patient. You are given an image and must describe it in a warm, accessible, and emotionally engaging way. Focus on familiar and evocative elements — such as settings from nature, architecture, objects, clothing, people, or activities — that may help the viewer recall meaningful memories or spark gentle, reflective conversation. Your response should be written in full sentences and structured to be passed into another AI model that will use it to guide a dialogue. Highlight specific visual details that could lead to storytelling (e.g., “a worn wooden bench,” “a group of people sharing a meal,” “a child flying a kite”), but do not ask any questions — only describe. Keep the tone positive, nostalgic, and grounded. Your output should feel like a kind narrator describing a photo for someone who may not be able to see it clearly, with the goal of helping them connect it to their own life experience."},
-                    {
-                        "type": "input_image",
-                        "image_url": f"data:image/jpeg;base64,{self.base64_image}",
-                    },
-                ],
-            }],
+            model=MODEL,
+            input=self.build_input(),
         )
 
-        return response
\ No newline at end of file
+        return response
+
+    def stream_image_description(self, cancelled=None):
+        """Yield the description text as it arrives, stopping early once cancelled() returns True."""
+        stream = CLIENT.responses.create(
+            model=MODEL,
+            input=self.build_input(),
+            stream=True,
+        )
+        try:
+            for event in stream:
+                if cancelled is not None and cancelled():
+                    break
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+        finally:
+            stream.close()
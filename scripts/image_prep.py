@@ -0,0 +1,61 @@
+"""Decodes uploaded photos once and prepares them for the vision model.
+
+The GUI uses the decoded image for its thumbnail and ImageDescriber encodes the
+same image for upload, so the file is only read and decoded once.
+"""
+import io
+
+from PIL import Image, ImageOps
+
+# The vision model fits images into 2048x2048 and then scales the short side to
+# 768 px, so anything larger is sent only to be thrown away
+MAX_LONG_SIDE = 2048
+MAX_SHORT_SIDE = 768
+JPEG_QUALITY = 85
+PNG_COMPRESS_LEVEL = 3  # zlib level 6+ is several times slower for a few % on photos
+# Files already small enough and upright are sent unchanged
+_PASSTHROUGH_MIME = {"JPEG": "image/jpeg", "PNG": "image/png"}
+
+
+def _target_size(width, height):
+    scale = min(1.0, MAX_LONG_SIDE / max(width, height), MAX_SHORT_SIDE / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def load_image(image_path):
+    """Decode an image once, at no more than the resolution the model uses, with EXIF rotation applied."""
+    image = Image.open(image_path)
+    source = (image_path, image.format, image.size, image.getexif().get(0x0112, 1))
+    # JPEGs can be decoded straight at a reduced scale, much cheaper for phone photos
+    image.draft("RGB", _target_size(*image.size))
+    image = ImageOps.exif_transpose(image)
+    image.info["source"] = source  # (path, format, size, EXIF orientation) of the file it came from
+    return image
+
+
+def encode_for_model(image):
+    """Return (bytes, mime type) to send: downscaled and re-encoded, PNG if it has transparency, JPEG otherwise.
+
+    A JPEG or PNG that is already small enough and upright is sent as it is.
+    """
+    path, source_format, source_size, orientation = image.info.get("source", (None, None, None, None))
+    size = _target_size(*image.size)
+    if path and source_format in _PASSTHROUGH_MIME and orientation == 1 and size == image.size == source_size:
+        with open(path, "rb") as image_file:
+            return image_file.read(), _PASSTHROUGH_MIME[source_format]
+
+    if size != image.size:
+        image = image.resize(size, Image.LANCZOS, reducing_gap=2.0)
+    buffer = io.BytesIO()
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image.save(buffer, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+        return buffer.getvalue(), "image/png"
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue(), "image/jpeg"
+
+
+def prepare_for_model(image_path):
+    """load_image() + encode_for_model() in one call, for running in a worker process."""
+    return encode_for_model(load_image(image_path))
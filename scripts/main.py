@@ -1,12 +1,55 @@
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import asyncio
 import os
 import json
+import re
+import time
+
+# Optional faster JSON decoders, the webhook falls back to the standard json module
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 #openai_api_key = os.getenv("OPENAI_API_KEY")
 client = OpenAI(api_key="")
 
-last_processed_user_text = ""
+EMOTION_TO_MODE = {
+    "positive": "happy",
+    "negative": "sad",
+    "neutral": "idle"
+}
+
+# Max number of classifier calls running at once, extra transcripts queue up behind them
+MAX_CONCURRENT_CLASSIFICATIONS = 4
+
+# Which emotion classifier the webhook uses: "local", "openai" or "local+openai"
+# (local lexicon first, OpenAI only when the lexicon is not confident)
+EMOTION_BACKEND = os.getenv("MIRO_EMOTION_BACKEND", "local")
+LOW_CONFIDENCE = 0.5
+
+# Emotion results are cached by normalised text, Vapi repeats each user turn in
+# transcript, conversation-update and end-of-call-report messages
+EMOTION_CACHE_SIZE = 512
+EMOTION_CACHE_TTL = 30 * 60  # seconds
+
+# Final transcripts are classified straight away. A partial transcript is only
+# classified if no newer transcript arrives for this many seconds (None = ignore partials)
+TRANSCRIPT_QUIET_WINDOW = 0.8
+
+# Webhook bodies bigger than this are rejected with 413 before being decoded
+MAX_WEBHOOK_BODY_BYTES = int(os.getenv("MIRO_WEBHOOK_MAX_BYTES", 4 * 1024 * 1024))
 
 def detect_emotion_from_text(text: str) -> str:
     prompt = f"""You are a therapist’s assistant trained to detect the emotional tone of a patient's message.
@@ -53,38 +96,390 @@ def detect_emotion_from_text(text: str) -> str:
         print("OpenAI Error:", e)
         return "unknown"
 
-def create_app(shared_state):
-    app = FastAPI()
-    last_processed_user_text = ""
+class EmotionClassifier:
+    """Base class for emotion backends.
+
+    classify() returns (emotion, confidence) where emotion is one of
+    positive/negative/neutral (or "unknown" on failure) and confidence is 0..1.
+    Instances are callable and return just the emotion, so they can be passed
+    anywhere detect_emotion_from_text is used.
+    """
+    name = "base"
+
+    def classify(self, text):
+        raise NotImplementedError
+
+    def __call__(self, text):
+        return self.classify(text)[0]
+
+
+class LexiconEmotionClassifier(EmotionClassifier):
+    """In-process word list classifier, no network and a few microseconds per utterance."""
+    name = "local"
+
+    POSITIVE = {
+        "happy": 1.0, "love": 1.0, "loved": 1.0, "lovely": 1.0, "wonderful": 1.0,
+        "great": 1.0, "good": 0.5, "nice": 0.5, "fun": 1.0, "enjoy": 1.0, "enjoyed": 1.0,
+        "beautiful": 1.0, "glad": 1.0, "grateful": 1.0, "thankful": 1.0, "calm": 0.5,
+        "laugh": 1.0, "laughed": 1.0, "smile": 1.0, "smiled": 1.0, "proud": 1.0,
+        "favourite": 1.0, "favorite": 1.0, "best": 1.0, "amazing": 1.0, "lucky": 1.0,
+        "warm": 0.5, "peaceful": 1.0, "fond": 1.0, "remember": 0.5, "excited": 1.0,
+        "brilliant": 1.0, "delighted": 1.0, "content": 0.5, "cheerful": 1.0,
+        "happiest": 1.0, "joy": 1.0, "laughing": 1.0, "smiling": 1.0, "loving": 1.0,
+    }
+    NEGATIVE = {
+        "sad": 1.0, "miss": 1.0, "missed": 1.0, "lonely": 1.0, "alone": 0.5, "angry": 1.0,
+        "upset": 1.0, "cry": 1.0, "cried": 1.0, "scared": 1.0, "afraid": 1.0, "worried": 1.0,
+        "anxious": 1.0, "confused": 1.0, "frustrated": 1.0, "hate": 1.0, "hated": 1.0,
+        "bad": 0.5, "awful": 1.0, "terrible": 1.0, "died": 1.0, "dead": 1.0, "death": 1.0,
+        "lost": 1.0, "hurt": 1.0, "pain": 1.0, "tired": 0.5, "sorry": 0.5, "forget": 0.5,
+        "forgot": 0.5, "hard": 0.5, "difficult": 0.5, "unhappy": 1.0, "horrible": 1.0,
+        "depressed": 1.0, "grief": 1.0, "funeral": 1.0, "ill": 0.5, "sick": 0.5,
+        "crying": 1.0, "cries": 1.0, "tears": 1.0, "sobbing": 1.0, "missing": 1.0,
+        "worry": 1.0, "worrying": 1.0, "scary": 1.0, "frightened": 1.0, "sadness": 1.0,
+    }
+    NEGATORS = {"not", "no", "never", "dont", "didnt", "cant", "couldnt", "wasnt", "isnt", "wont", "nothing"}
+    INTENSIFIERS = {"very": 1.5, "really": 1.5, "so": 1.3, "extremely": 2.0, "quite": 1.2}
+    # Short, non-committal replies that the prompt tells the LLM to treat as neutral
+    VAGUE = {"okay", "ok", "sure", "maybe", "yes", "yeah", "no", "hmm", "i dont know", "not sure", "fine"}
+
+    TOKEN_RE = re.compile(r"[a-z]+")
+
+    def __init__(self, negation_window=3):
+        self.negation_window = negation_window
+
+    def classify(self, text):
+        tokens = self.TOKEN_RE.findall(text.lower().replace("'", "").replace("\u2019", ""))
+        if not tokens:
+            return "neutral", 1.0
+
+        pos = neg = 0.0
+        negate_left = 0
+        boost = 1.0
+        for tok in tokens:
+            if tok in self.NEGATORS:
+                negate_left = self.negation_window
+                continue
+            if tok in self.INTENSIFIERS:
+                boost = self.INTENSIFIERS[tok]
+                continue
+
+            weight = self.POSITIVE.get(tok, 0.0) - self.NEGATIVE.get(tok, 0.0)
+            if weight:
+                weight *= boost
+                if negate_left:
+                    weight = -weight
+                if weight > 0:
+                    pos += weight
+                else:
+                    neg -= weight
+            boost = 1.0
+            if negate_left:
+                negate_left -= 1
+
+        total = pos + neg
+        if total == 0:
+            # Nothing emotional said: confident for short vague replies, unsure for longer ones
+            vague = " ".join(tokens) in self.VAGUE or len(tokens) <= 3
+            return "neutral", 0.9 if vague else 0.3
+
+        net = pos - neg
+        if net == 0:
+            return "neutral", 0.3
+        confidence = abs(net) / total * min(1.0, total / 1.5)
+        return ("positive" if net > 0 else "negative"), round(confidence, 3)
+
+
+class OpenAIEmotionClassifier(EmotionClassifier):
+    """Remote gpt-4o-mini classifier (detect_emotion_from_text)."""
+    name = "openai"
+
+    def classify(self, text):
+        emotion = detect_emotion_from_text(text)
+        if emotion in EMOTION_TO_MODE:
+            return emotion, 1.0
+        return "unknown", 0.0
+
+
+class FallbackEmotionClassifier(EmotionClassifier):
+    """Use the primary backend, only asking the fallback when the primary is not confident."""
+
+    def __init__(self, primary, fallback, min_confidence=LOW_CONFIDENCE):
+        self.primary = primary
+        self.fallback = fallback
+        self.min_confidence = min_confidence
+        self.name = f"{primary.name}+{fallback.name}"
+
+    def classify(self, text):
+        emotion, confidence = self.primary.classify(text)
+        if confidence >= self.min_confidence:
+            return emotion, confidence
+
+        fallback_emotion, fallback_confidence = self.fallback.classify(text)
+        if fallback_emotion == "unknown":
+            # Fallback failed (e.g. no network): unsure, so neutral like the prompt asks
+            return "neutral", confidence
+        return fallback_emotion, fallback_confidence
+
+
+class ThresholdEmotionClassifier(EmotionClassifier):
+    """Turn answers below min_confidence into neutral ("If unsure, return neutral"),
+    so a guess never moves MiRo to happy or sad."""
+
+    def __init__(self, primary, min_confidence=LOW_CONFIDENCE):
+        self.primary = primary
+        self.min_confidence = min_confidence
+        self.name = primary.name
+
+    def classify(self, text):
+        emotion, confidence = self.primary.classify(text)
+        if confidence < self.min_confidence and emotion != "unknown":
+            return "neutral", confidence
+        return emotion, confidence
+
+
+def make_classifier(backend=EMOTION_BACKEND):
+    if backend == "local":
+        return ThresholdEmotionClassifier(LexiconEmotionClassifier())
+    if backend == "openai":
+        return OpenAIEmotionClassifier()
+    if backend == "local+openai":
+        return FallbackEmotionClassifier(LexiconEmotionClassifier(), OpenAIEmotionClassifier())
+    raise ValueError(f"Unknown emotion backend: {backend}")
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def normalize_utterance(text):
+    """Fold case, punctuation and whitespace so "Okay." and "okay" share a cache entry."""
+    text = text.lower().replace("\u2019", "").replace("'", "")
+    text = _PUNCTUATION_RE.sub(" ", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class EmotionCache:
+    """Bounded LRU cache of emotion results with a time-to-live and hit/miss counters."""
+
+    def __init__(self, maxsize=EMOTION_CACHE_SIZE, ttl=EMOTION_CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (emotion, stored_at)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            emotion, stored_at = entry
+            if self.ttl is None or self.clock() - stored_at < self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return emotion
+            del self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, emotion):
+        self.entries[key] = (emotion, self.clock())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+if msgspec is not None:
+    # Only the fields vapi_webhook reads, everything else in the payload is skipped while decoding
+    class _WebhookCall(msgspec.Struct, omit_defaults=True):
+        id: Optional[str] = None
+
+    class _WebhookEntry(msgspec.Struct, omit_defaults=True):
+        role: Optional[str] = None
+        content: Optional[str] = None
+
+    class _WebhookMessage(msgspec.Struct, omit_defaults=True):
+        type: Optional[str] = None
+        role: Optional[str] = None
+        status: Optional[str] = None
+        transcript: Optional[str] = None
+        transcriptType: Optional[str] = None
+        content: Optional[str] = None
+        call: Optional[_WebhookCall] = None
+        conversation: Optional[List[_WebhookEntry]] = None
+
+    class _WebhookPayload(msgspec.Struct, omit_defaults=True):
+        message: Optional[_WebhookMessage] = None
+
+    _webhook_decoder = msgspec.json.Decoder(_WebhookPayload)
+else:
+    _webhook_decoder = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+def decode_webhook_payload(body):
+    """Decode a webhook body into plain dicts.
+
+    With msgspec installed only the fields the handler uses are decoded. Payloads
+    that do not match that schema are decoded in full with orjson (or json).
+    Raises ValueError for invalid JSON.
+    """
+    if _webhook_decoder is not None:
+        try:
+            return msgspec.to_builtins(_webhook_decoder.decode(body))
+        except msgspec.DecodeError:
+            pass
+    return _json_loads(body)
+
+async def read_limited_body(request, limit):
+    """Return the request body, or None if it is larger than limit bytes."""
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > limit:
+        return None
+
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def create_app(shared_state, classifier=None,
+               max_concurrent_classifications=MAX_CONCURRENT_CLASSIFICATIONS,
+               emotion_cache=None, quiet_window=TRANSCRIPT_QUIET_WINDOW,
+               max_body_bytes=MAX_WEBHOOK_BODY_BYTES, on_user_text=None):
+    # on_user_text(text), if given, is called with every final user transcript
+    # (start_screen.py forwards them to the Vapi process for history retrieval)
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        # Classifications still queued when the server stops are not worth waiting for
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    app = FastAPI(lifespan=lifespan)
+
+    if classifier is None:
+        classifier = make_classifier()
+    print(f"[EMOTION] Using classifier: {getattr(classifier, 'name', classifier)}")
+
+    # The classifier may be a blocking network call, run it off the event loop so
+    # speech-update events are not stuck behind it
+    executor = ThreadPoolExecutor(max_workers=max_concurrent_classifications,
+                                  thread_name_prefix="emotion")
+
+    if emotion_cache is None:
+        emotion_cache = EmotionCache()
+    app.state.emotion_cache = emotion_cache
+    in_flight = {}  # normalised text -> future, so concurrent duplicates share one call
+
+    async def classify(text):
+        key = normalize_utterance(text)
+        emotion = emotion_cache.get(key)
+        if emotion is not None:
+            print(f"[EMOTION CACHE] hit for: {key}")
+            return emotion
+
+        future = in_flight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(executor, classifier, text)
+            in_flight[key] = future
+
+            def remember(done, key=key):
+                in_flight.pop(key, None)
+                if not done.cancelled() and done.exception() is None and done.result() in EMOTION_TO_MODE:
+                    emotion_cache.put(key, done.result())
+
+            future.add_done_callback(remember)
+        # Shielded so a cancelled request does not cancel the call other requests are waiting on
+        return await asyncio.shield(future)
+
+    # Per call: latest transcript sequence number, the pending classification task
+    # and how many conversation entries have already been processed.
+    # A result is only applied if its sequence number is still the latest one.
+    calls = {}
+
+    def call_id_of(msg):
+        call = msg.get("call")
+        call_id = call.get("id") if isinstance(call, dict) else None
+        return call_id if isinstance(call_id, str) else "default"
+
+    def call_state(msg):
+        return calls.setdefault(call_id_of(msg), {"seq": 0, "task": None, "offset": 0})
+
+    async def classify_transcript(state, seq, text, delay):
+        if delay:
+            await asyncio.sleep(delay)
+        emotion = await classify(text)
+        if state["seq"] != seq:
+            print(f"[STALE] Dropping emotion for superseded transcript: {text}")
+            return
+        print(f"[EMOTION DETECTED] {emotion}")
+        if emotion in EMOTION_TO_MODE:
+            shared_state["current_mode"] = EMOTION_TO_MODE[emotion]
+
+    def on_transcript_done(task):
+        if not task.cancelled() and task.exception() is not None:
+            print("Transcript classification error:", task.exception())
+
+    @app.get("/emotion-stats")
+    async def emotion_stats():
+        return emotion_cache.stats()
 
     @app.post("/vapi-webhook")
     async def vapi_webhook(request: Request):
-        nonlocal shared_state
-        nonlocal last_processed_user_text
-        payload = await request.json()
+        body = await read_limited_body(request, max_body_bytes)
+        if body is None:
+            print(f"[WEBHOOK] Rejected payload larger than {max_body_bytes} bytes")
+            return JSONResponse({"status": "error", "detail": "payload too large"}, status_code=413)
+        try:
+            payload = decode_webhook_payload(body)
+        except ValueError:
+            return JSONResponse({"status": "error", "detail": "invalid JSON"}, status_code=400)
+
+        message = (payload.get("message") or {}) if isinstance(payload, dict) else None
+        if not isinstance(message, dict):
+            return JSONResponse({"status": "error", "detail": "message must be a JSON object"}, status_code=400)
+
+        await handle_message(message)
+        return {"status": "ok"}
 
-        msg = payload.get("message", {})
+    async def handle_message(msg):
         msg_type = msg.get("type")
 
-        print(shared_state)
-
         if msg_type == "transcript":
-
-
-            text = msg.get("content", "")
-            print(f"[TRANSCRIPT] User said: {text}")
-            emotion = detect_emotion_from_text(text)
-            print(f"[EMOTION DETECTED] {emotion}")
-
-            # Update shared state
-            print("transcript:", emotion)
-
-            if emotion in ["positive", "negative", "neutral"]:
-                shared_state["current_mode"] = {
-                    "positive": "happy",
-                    "negative": "sad",
-                    "neutral": "idle"
-                }[emotion]
+            text = msg.get("transcript") or msg.get("content")
+            if not isinstance(text, str):
+                text = ""
+            is_final = msg.get("transcriptType", "final") == "final"
+
+            if msg.get("role", "user") != "user" or not text:
+                pass
+            elif not is_final and quiet_window is None:
+                print(f"[TRANSCRIPT] Ignoring partial: {text}")
+            else:
+                print(f"[TRANSCRIPT] User said: {text}")
+                if is_final and on_user_text is not None:
+                    on_user_text(text)
+                # Newer text supersedes whatever is still waiting or being classified
+                state = call_state(msg)
+                state["seq"] += 1
+                if state["task"] is not None and not state["task"].done():
+                    state["task"].cancel()
+                state["task"] = asyncio.ensure_future(
+                    classify_transcript(state, state["seq"], text, 0 if is_final else quiet_window))
+                state["task"].add_done_callback(on_transcript_done)
 
         elif msg_type == "speech-update":
             status = msg.get("status", "")
@@ -101,33 +496,40 @@ def create_app(shared_state):
                         print("[MIRO DONE] Assistant has finished speaking.")
 
         elif msg_type in ["conversation-update", "end-of-call-report"]:
-            conversation = msg.get("conversation", [])
-            for entry in reversed(conversation):
-                if entry.get("role") == "user":
-                    text = entry.get("content", "")
-                    if text != last_processed_user_text:
-                        print(f"[CONVERSATION-UPDATE] Last user message: {text}")
-                        emotion = detect_emotion_from_text(text)
-                        print(f"[EMOTION DETECTED] {emotion}")
-
-                        print({
-                            "positive": "happy",
-                            "negative": "sad",
-                            "neutral": "idle"
-                        }.get(emotion, "idle")) 
-
-                        if shared_state["current_mode"] != "listening":
-                            shared_state["current_mode"] = {
-                                "positive": "happy",
-                                "negative": "sad",
-                                "neutral": "idle"
-                            }.get(emotion, "idle")
-
-                        last_processed_user_text = text
-                    else:
-                        print("[SKIPPED] Duplicate message — already processed.")
-                    break
-
-        return {"status": "ok"}
+            conversation = msg.get("conversation")
+            if not isinstance(conversation, list):
+                conversation = []
+            state = call_state(msg)
+
+            # The conversation only grows, so just look at entries after the watermark
+            start = state["offset"] if state["offset"] <= len(conversation) else 0
+            new_user_texts = [entry["content"] for entry in conversation[start:]
+                              if isinstance(entry, dict) and entry.get("role") == "user"
+                              and isinstance(entry.get("content"), str) and entry["content"]]
+            state["offset"] = len(conversation)
+
+            if new_user_texts:
+                seq = state["seq"]
+                emotions = await asyncio.gather(*(classify(text) for text in new_user_texts))
+                for text, emotion in zip(new_user_texts, emotions):
+                    print(f"[CONVERSATION-UPDATE] New user message: {text}")
+                    print(f"[EMOTION DETECTED] {emotion}")
+
+                # The most recent turn decides the mode
+                mode = EMOTION_TO_MODE.get(emotions[-1], "idle")
+                print(mode)
+
+                if state["seq"] != seq:
+                    print("[STALE] A newer transcript arrived while classifying, not changing mode.")
+                elif shared_state["current_mode"] != "listening":
+                    shared_state["current_mode"] = mode
+            else:
+                print("[SKIPPED] No new user messages.")
+
+            if msg_type == "end-of-call-report":
+                calls.pop(call_id_of(msg), None)
+
+    # Exposed for benchmarks that want handler time without HTTP and decoding
+    app.state.handle_message = handle_message
 
     return app
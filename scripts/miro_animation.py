@@ -0,0 +1,116 @@
+"""Data-driven animation for MiRo's joints: behaviours as oscillator tracks, one-shot keyframe clips, blending.
+
+Every joint MiRo is driven through is one channel of a pose vector (CHANNELS).
+A Behaviour is a base pose plus a sine oscillator per channel, so a whole
+behaviour is evaluated for all joints at once with NumPy. A Clip is a set of
+keyframes over a few channels, played once on top of the behaviour (a blink).
+On a mode change AnimationEngine blends from the pose MiRo is in towards the
+new behaviour, so nothing snaps and no behaviour needs its own reset code.
+Only the current behaviour is evaluated each tick, however many are declared.
+"""
+import math
+
+import numpy as np
+
+CHANNELS = (
+    "droop", "wag", "eyelid_left", "eyelid_right", "ear_left", "ear_right",  # cosmetic joints, 0..1
+    "tilt", "lift", "yaw", "pitch",                                          # kinematic joints, radians
+    "linear_x", "angular_z",                                                 # body velocity, m/s and rad/s
+)
+CHANNEL_INDEX = {name: i for i, name in enumerate(CHANNELS)}
+COSMETIC = slice(0, 6)
+KINEMATIC = slice(6, 10)
+VELOCITY = slice(10, 12)
+
+NEUTRAL = np.zeros(len(CHANNELS))
+NEUTRAL[CHANNEL_INDEX["wag"]] = 0.5
+NEUTRAL[CHANNEL_INDEX["ear_left"]] = 0.5
+NEUTRAL[CHANNEL_INDEX["ear_right"]] = 0.5
+NEUTRAL[CHANNEL_INDEX["lift"]] = math.radians(34.0)
+
+BLEND_SECONDS = 0.4
+
+
+def channel_vector(values, default=0.0):
+    """{"lift": 0.6, ...} -> vector over CHANNELS, other channels set to default."""
+    vector = np.full(len(CHANNELS), default, dtype=float)
+    for name, value in values.items():
+        vector[CHANNEL_INDEX[name]] = value
+    return vector
+
+
+class Behaviour:
+    """base: channel -> value (the rest come from NEUTRAL).
+    oscillators: channel -> (amplitude, frequency in Hz) or (amplitude, frequency, phase)."""
+
+    def __init__(self, base=None, oscillators=None, led=None, tone=False):
+        self.base = NEUTRAL.copy()
+        for name, value in (base or {}).items():
+            self.base[CHANNEL_INDEX[name]] = value
+        oscillators = {name: tuple(track) + (0.0,) * (3 - len(track)) for name, track in (oscillators or {}).items()}
+        self.amplitude = channel_vector({name: track[0] for name, track in oscillators.items()})
+        self.angular_frequency = 2 * math.pi * channel_vector({name: track[1] for name, track in oscillators.items()})
+        self.phase = channel_vector({name: track[2] for name, track in oscillators.items()})
+        self.led = led
+        self.tone = tone
+
+    def pose(self, t, offset=None):
+        pose = self.base + self.amplitude * np.sin(self.angular_frequency * t + self.phase)
+        return pose if offset is None else pose + offset
+
+
+class Clip:
+    """Keyframes played once over some channels: times (seconds from the start) and, per channel, its values."""
+
+    def __init__(self, times, tracks):
+        self.times = np.asarray(times, dtype=float)
+        self.channels = np.array([CHANNEL_INDEX[name] for name in tracks])
+        self.values = np.array([tracks[name] for name in tracks], dtype=float).T  # keyframe x channel
+        self.duration = float(self.times[-1])
+
+    def sample(self, t):
+        """Values of every channel at t, linearly interpolated between keyframes."""
+        i = int(np.clip(np.searchsorted(self.times, t, side="right") - 1, 0, len(self.times) - 2))
+        span = self.times[i + 1] - self.times[i]
+        frac = 0.0 if span <= 0 else min(1.0, max(0.0, (t - self.times[i]) / span))
+        return self.values[i] + (self.values[i + 1] - self.values[i]) * frac
+
+
+class AnimationEngine:
+    def __init__(self, behaviours, blend_seconds=BLEND_SECONDS):
+        self.behaviours = behaviours
+        self.blend_seconds = blend_seconds
+        self.pose = NEUTRAL.copy()
+        self.current = None
+        self.started = 0.0
+        self.offset = None
+        self.blend_from = None
+        self.blend_started = 0.0
+        self.clips = []  # (clip, started)
+
+    def set_behaviour(self, name, now, offset=None):
+        """Switch to behaviour name, blending from the current pose. offset is added to its base (a vector)."""
+        self.blend_from = self.pose.copy()
+        self.blend_started = now
+        self.current = self.behaviours[name]
+        self.started = now
+        self.offset = offset
+
+    def play(self, clip, now):
+        self.clips.append((clip, now))
+
+    def evaluate(self, now):
+        """The pose for time now (monotonic seconds), also kept as self.pose."""
+        pose = NEUTRAL.copy() if self.current is None else self.current.pose(now - self.started, self.offset)
+        if self.blend_from is not None:
+            w = min(1.0, (now - self.blend_started) / self.blend_seconds) if self.blend_seconds > 0 else 1.0
+            w = w * w * (3.0 - 2.0 * w)  # smoothstep, eases in and out of the transition
+            pose = self.blend_from + (pose - self.blend_from) * w
+            if w >= 1.0:
+                self.blend_from = None
+        if self.clips:
+            self.clips = [(clip, started) for clip, started in self.clips if now - started <= clip.duration]
+            for clip, started in self.clips:
+                pose[clip.channels] = clip.sample(now - started)
+        self.pose = pose
+        return pose
@@ -9,12 +9,17 @@ import numpy as np
 import rospy
 import select
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from std_msgs.msg import Float32MultiArray, UInt32MultiArray, UInt16MultiArray
 from sensor_msgs.msg import JointState
 from geometry_msgs.msg import TwistStamped
 from std_msgs.msg import Int16MultiArray
-import queue as mp_queue
+from rospy.numpy_msg import numpy_msg
+
+from miro_animation import COSMETIC, KINEMATIC, NEUTRAL, VELOCITY, AnimationEngine, Behaviour, Clip, channel_vector
+from miro_scheduler import TickScheduler, TickStats
 
 # ROS Messages
 cos_joints = Float32MultiArray(data=[0.0] * 6)
@@ -32,6 +37,93 @@ LED_HAPPY = led_color(255, 255, 0)
 LED_SPEAKING = led_color(255, 165, 0)
 LED_LISTENING = led_color(0, 255, 0)
 
+# Int16MultiArray that serialises its numpy data directly instead of going through a list
+AudioStreamMsg = numpy_msg(Int16MultiArray)
+
+# Speaker stream
+STREAM_SAMPLE_RATE = 8000
+STREAM_BLOCK = 800          # samples per published message (100 ms)
+STREAM_TARGET_DEPTH = 1600  # after dropping, keep this much queued (200 ms)
+STREAM_MAX_DEPTH = 4000     # once more than this (500 ms) is queued the oldest audio is dropped
+STREAM_IDLE_POLL = 0.01     # seconds between checks while no audio is queued
+STREAM_FLUSH_AFTER = 0.15   # send a partial block once no audio has arrived for this long
+
+class AudioStreamPublisher(threading.Thread):
+    """Publishes the assistant's audio from an AudioRing to MiRo at the stream rate.
+
+    Runs apart from the 50 Hz control loop so a slow tick does not let the audio
+    back up. If the queue still grows past STREAM_MAX_DEPTH the oldest samples are
+    dropped so MiRo never drifts far behind the assistant.
+    """
+
+    def __init__(self, ring, publisher):
+        super().__init__(name="miro-audio", daemon=True)
+        self.ring = ring
+        self.publisher = publisher
+        self.stop_event = threading.Event()
+        self.block = np.empty(STREAM_BLOCK, dtype=np.int16)
+        self.published_blocks = 0
+        self.published_samples = 0
+        self.dropped_samples = 0
+        self.short_blocks = 0
+        self.max_depth = 0
+
+    def stop(self):
+        self.stop_event.set()
+        self.join(timeout=1.0)
+
+    def stats(self):
+        depth = self.ring.available()
+        return {
+            "queue_depth_samples": depth,
+            "added_latency_ms": 1000.0 * depth / STREAM_SAMPLE_RATE,
+            "max_added_latency_ms": 1000.0 * self.max_depth / STREAM_SAMPLE_RATE,
+            "published_blocks": self.published_blocks,
+            "published_samples": self.published_samples,
+            "short_blocks": self.short_blocks,
+            "dropped_samples": self.dropped_samples,
+        }
+
+    def run(self):
+        next_time = time.monotonic()
+        last_depth = 0
+        last_change = next_time
+        while not self.stop_event.is_set():
+            depth = self.ring.available()
+            self.max_depth = max(self.max_depth, depth)
+            if depth > STREAM_MAX_DEPTH:
+                dropped = self.ring.discard(depth - STREAM_TARGET_DEPTH)
+                self.dropped_samples += dropped
+                depth -= dropped
+                print(f"[MIRO AUDIO] {1000.0 * (depth + dropped) / STREAM_SAMPLE_RATE:.0f} ms behind, dropped {dropped} samples")
+
+            # Wait for a full block unless the producer has stopped adding audio
+            now = time.monotonic()
+            if depth != last_depth:
+                last_change = now
+            if depth >= STREAM_BLOCK or (depth and now - last_change >= STREAM_FLUSH_AFTER):
+                chunk = self.ring.read(STREAM_BLOCK, out=self.block)
+            else:
+                chunk = self.block[:0]
+            last_depth = depth - chunk.size
+            if chunk.size:
+                self.publisher.publish(AudioStreamMsg(data=chunk))
+                self.published_blocks += 1
+                self.published_samples += chunk.size
+                if chunk.size < STREAM_BLOCK:
+                    self.short_blocks += 1
+                # Pace by the duration of the audio just sent
+                next_time += chunk.size / STREAM_SAMPLE_RATE
+            else:
+                next_time += STREAM_IDLE_POLL
+
+            delay = next_time - time.monotonic()
+            if delay < -STREAM_IDLE_POLL:
+                # Fell behind (or was idle), restart the schedule from now
+                next_time = time.monotonic()
+                delay = 0.0
+            self.stop_event.wait(max(0.0, delay))
+
 # Microphone Control
 def is_mic_muted():
     result = subprocess.run(["amixer", "get", "Capture"], stdout=subprocess.PIPE, text=True)
@@ -43,6 +135,14 @@ def mute_mic():
 def unmute_mic():
     subprocess.run(["amixer", "set", "Capture", "cap"], stdout=subprocess.DEVNULL)
 
+def unmute_mic_if_muted():
+    if is_mic_muted():
+        unmute_mic()
+
+# amixer takes several ms per call, so mode changes queue the mic commands here,
+# one thread keeps them in order and off the control loop
+mic_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="miro-mic")
+
 # ROS Publishers
 def init_publishers():
     topic_base = "/" + os.getenv("MIRO_ROBOT_NAME")
@@ -54,120 +154,64 @@ def init_publishers():
         "tone": rospy.Publisher(topic_base + "/control/tone", UInt16MultiArray, queue_size=0)
     }
 
-# Behaviors
-happy_tone_played = False
-happy_vel_phase = 0.0
-def happy_behavior_step(pubs, wag_phase):
-    global happy_tone_played, happy_vel_phase
-    wag_phase += math.pi * 5.0 / 50.0
-    wag_phase %= 2 * math.pi
-    cos_joints.data[0] = 0.0
-    cos_joints.data[1] = math.sin(wag_phase) * 0.5 + 0.5
-    kin_joints.position[1] = math.radians(22.0)
-    pubs["cos"].publish(cos_joints)
-    pubs["kin"].publish(kin_joints)
-
-    if not happy_tone_played:
-        pubs["tone"].publish(tone_msg)
-        happy_tone_played = True
-
-    happy_vel_phase += 0.3
-    vel_msg.twist.linear.x = 0.02 * math.sin(happy_vel_phase)
-    vel_msg.twist.angular.z = 0.5 * math.sin(happy_vel_phase * 0.5)
-    pubs["vel"].publish(vel_msg)
-    return wag_phase
-
-sad_phase = 0.0
-def sad_behavior_step(pubs):
-    global sad_phase
-    sad_phase += 2 * math.pi * 0.3 / 50.0
-    sad_phase %= 2 * math.pi
-    cos_joints.data[2] =  1.0
-    cos_joints.data[3] = 1.0
-    cos_joints.data[0] = 1.0
-    cos_joints.data[1] = 0.1
-    kin_joints.position[2] = math.radians(10.0 * math.sin(sad_phase))
-    kin_joints.position[1] = math.radians(150.0)
-    kin_joints.position[3] = math.radians(250.0)
-    pubs["cos"].publish(cos_joints)
-    pubs["kin"].publish(kin_joints)
+# Behaviours, as data for the animation engine (see miro_animation.py). Frequencies are
+# the ones the old per-tick step functions ran at with a 50 Hz loop.
+BEHAVIOURS = {
+    "idle": Behaviour(
+        oscillators={"wag": (0.5, 1.25)},
+        led=LED_IDLE),
+    "happy": Behaviour(
+        base={"lift": math.radians(22.0)},
+        oscillators={"wag": (0.5, 2.5), "linear_x": (0.02, 2.39), "angular_z": (0.5, 1.19)},
+        led=LED_HAPPY, tone=True),
+    "sad": Behaviour(
+        base={"droop": 1.0, "wag": 0.1, "eyelid_left": 1.0, "eyelid_right": 1.0,
+              "lift": math.radians(150.0), "pitch": math.radians(250.0)},
+        oscillators={"yaw": (math.radians(10.0), 0.3)},
+        led=LED_SAD),
+    "speaking": Behaviour(
+        oscillators={"pitch": (math.radians(10.0), 3.75)},
+        led=LED_SPEAKING),
+    "listening": Behaviour(
+        base={"ear_left": 0.2, "ear_right": 0.8},
+        led=LED_LISTENING),
+}
 
-speaking_phase = 0.0
-def speaking_behavior_step(pubs):
-    global speaking_phase
-    speaking_phase += 2 * math.pi * 1.5 / 20.0
-    speaking_phase %= 2 * math.pi
-    kin_joints.position[3] = math.radians(10.0 * math.sin(speaking_phase))
-    pubs["kin"].publish(kin_joints)
+BLINK = Clip([0.0, 0.05, 0.45, 0.5], {"eyelid_left": [0.0, 1.0, 1.0, 0.0], "eyelid_right": [0.0, 1.0, 1.0, 0.0]})
 
-listening_active = False
-def listening_enter(pubs):
-    global listening_active
-    listening_active = True
-    if is_mic_muted():
-        unmute_mic()
-    kin_joints.position[2] = math.radians(35 * random.choice([-1, 1]))
-    cos_joints.data[4] = 0.2
-    cos_joints.data[5] = 0.8
-    pubs["kin"].publish(kin_joints)
+def publish_pose(pubs, pose, moving):
+    cos_joints.data = pose[COSMETIC].tolist()
+    kin_joints.position = pose[KINEMATIC].tolist()
     pubs["cos"].publish(cos_joints)
-
-def listening_exit(pubs):
-    global listening_active
-    listening_active = False
-    mute_mic()
-    kin_joints.position[2] = 0.0
-    kin_joints.position[3] = 0.0
-    cos_joints.data[4] = 0.5
-    cos_joints.data[5] = 0.5
     pubs["kin"].publish(kin_joints)
-    pubs["cos"].publish(cos_joints)
-
-# Exit/reset behavior per mode
-def exit_mode(mode, pubs):
-    global happy_tone_played
-    if mode == "happy":
-        happy_tone_played = False
-        vel_msg.twist.linear.x = 0.0
-        vel_msg.twist.angular.z = 0.0
-        kin_joints.position[1] = math.radians(34.0)
+    velocity = pose[VELOCITY]
+    if moving or velocity.any():
+        # Published while the body moves and once more when it has stopped
+        vel_msg.twist.linear.x, vel_msg.twist.angular.z = velocity.tolist()
         pubs["vel"].publish(vel_msg)
-        pubs["kin"].publish(kin_joints)
-    elif mode == "sad":
-        kin_joints.position[1] = math.radians(34.0)
-        kin_joints.position[2] = 0.0
-        kin_joints.position[3] = 0.0
-        cos_joints.data[0] = 0.0
-        cos_joints.data[2] = 0
-        cos_joints.data[3] = 0
-        pubs["cos"].publish(cos_joints)
-        pubs["kin"].publish(kin_joints)
-    elif mode == "speaking":
-        kin_joints.position[3] = 0.0
-        pubs["kin"].publish(kin_joints)
-    elif mode == "listening":
-        listening_exit(pubs)
-
-# Idle
-def idle_behavior_step(pubs, wag_phase):
-    pubs["illum"].publish(LED_IDLE)
-    wag_phase += 2 * math.pi * 0.5 / 20.0
-    wag_phase %= 2 * math.pi
-    cos_joints.data[1] = math.sin(wag_phase) * 0.5 + 0.5
-    pubs["cos"].publish(cos_joints)
-    pubs["kin"].publish(kin_joints)
-    return wag_phase
+    return bool(velocity.any())
+
+def enter_mode(mode, pubs, engine):
+    name = mode if mode in BEHAVIOURS else "idle"
+    behaviour = BEHAVIOURS[name]
+    pubs["illum"].publish(behaviour.led)
+    if behaviour.tone:
+        pubs["tone"].publish(tone_msg)
+    offset = None
+    if name == "listening":
+        mic_worker.submit(unmute_mic_if_muted)
+        offset = channel_vector({"yaw": math.radians(35 * random.choice([-1, 1]))})  # turn an ear to the patient
+    engine.set_behaviour(name, time.monotonic(), offset)
 
-def blink_if_needed(pubs, last_blink_time, blink_interval=6.0):
+def exit_mode(mode):
+    # Joints need no reset, the engine blends into the next behaviour
+    if mode == "listening":
+        mic_worker.submit(mute_mic)
+
+def blink_if_needed(engine, last_blink_time, blink_interval=6.0):
     now = time.time()
     if now - last_blink_time >= blink_interval:
-        cos_joints.data[2] = 1.0
-        cos_joints.data[3] = 1.0
-        pubs["cos"].publish(cos_joints)
-        rospy.sleep(0.5)
-        cos_joints.data[2] = 0.0
-        cos_joints.data[3] = 0.0
-        pubs["cos"].publish(cos_joints)
+        engine.play(BLINK, time.monotonic())
         return now
     return last_blink_time
 
@@ -176,100 +220,76 @@ def get_pressed_key():
         return sys.stdin.read(1)
     return None
 
-def run_miro_with_queue(shared_state, audio_queue):
+# mode_events is an optional ModeSubscriber (see shared_state.py). With it the loop
+# sleeps on the notification pipe between ticks and starts the next tick as soon as
+# the mode changes, without it the loop just sleeps for a tick.
+# tick_stats is an optional TickStats created by the GUI so it can show the loop timing.
+def run_miro_with_queue(shared_state, audio_queue, mode_events=None, tick_stats=None):
     rospy.init_node("miro_emotion_modes", anonymous=True)
     pubs = init_publishers()
-    audio_pub = rospy.Publisher("/miro/control/stream", Int16MultiArray, queue_size=1)
+    audio_pub = rospy.Publisher("/miro/control/stream", AudioStreamMsg, queue_size=1)
+    audio_thread = AudioStreamPublisher(audio_queue, audio_pub)
 
     # Initial reset
     if not is_mic_muted():
         mute_mic()
-    cos_joints.data = [0.0] * 6
-    cos_joints.data[2] = 0.0
-    cos_joints.data[3] = 0.0
-    cos_joints.data[4] = 0.5
-    cos_joints.data[5] = 0.5
-    cos_joints.data[1] = 0.5
-    pubs["cos"].publish(cos_joints)
-    kin_joints.position = [0.0, math.radians(34.0), 0.0, 0.0]
-    pubs["kin"].publish(kin_joints)
+    publish_pose(pubs, NEUTRAL, moving=True)
     pubs["illum"].publish(LED_IDLE)
 
+    engine = AnimationEngine(BEHAVIOURS)
+    moving = False
     current_mode = None
     pending_mode = None
-    wag_phase = 0.0
     last_blink_time = time.time()
-    rate = rospy.Rate(50)
+    tick_stats = tick_stats or TickStats()
+    scheduler = TickScheduler(tick_stats)
+
+    # Only re-read the mode when the sequence number says it changed
+    requested_mode, seen_seq, _ = shared_state.snapshot()
+
+    audio_thread.start()
 
     try:
         while not rospy.is_shutdown():
-            requested_mode = shared_state["current_mode"]
+            scheduler.begin_tick()
+            if shared_state.seq != seen_seq:
+                requested_mode, seen_seq, _ = shared_state.snapshot()
 
             if requested_mode != current_mode:
                 now = time.time()
                 if current_mode in ["happy", "sad"] and (now - mode_start_time) < 3.0:
                     pending_mode = requested_mode
                 else:
-                    exit_mode(current_mode, pubs)
+                    exit_mode(current_mode)
                     current_mode = requested_mode
                     mode_start_time = now
                     pending_mode = None
-                    if current_mode == "happy":
-                        pubs["illum"].publish(LED_HAPPY)
-                    elif current_mode == "sad":
-                        pubs["illum"].publish(LED_SAD)
-                    elif current_mode == "speaking":
-                        pubs["illum"].publish(LED_SPEAKING)
-                    elif current_mode == "listening":
-                        pubs["illum"].publish(LED_LISTENING)
-                        listening_enter(pubs)
-                    else:
-                        pubs["illum"].publish(LED_IDLE)
+                    enter_mode(current_mode, pubs, engine)
 
             elif pending_mode and (time.time() - mode_start_time) >= 3.0:
-                exit_mode(current_mode, pubs)
+                exit_mode(current_mode)
                 current_mode = pending_mode
                 mode_start_time = time.time()
                 pending_mode = None
-                if current_mode == "happy":
-                    pubs["illum"].publish(LED_HAPPY)
-                elif current_mode == "sad":
-                    pubs["illum"].publish(LED_SAD)
-                elif current_mode == "speaking":
-                    pubs["illum"].publish(LED_SPEAKING)
-                elif current_mode == "listening":
-                    pubs["illum"].publish(LED_LISTENING)
-                    listening_enter(pubs)
-                else:
-                    pubs["illum"].publish(LED_IDLE)
-
-            if current_mode == "happy":
-                wag_phase = happy_behavior_step(pubs, wag_phase)
-            elif current_mode == "sad":
-                sad_behavior_step(pubs)
-            elif current_mode == "speaking":
-                speaking_behavior_step(pubs)
-            elif current_mode == "listening" and listening_active:
-                pass
-            else:
-                wag_phase = idle_behavior_step(pubs, wag_phase)
-                last_blink_time = blink_if_needed(pubs, last_blink_time)
+                enter_mode(current_mode, pubs, engine)
 
-            # NEW: Check audio queue
-            try:
-                chunk = audio_queue.get_nowait()
-                if isinstance(chunk, np.ndarray):
-                    audio_pub.publish(Int16MultiArray(data=chunk.tolist()))
-            except mp_queue.Empty:
-                pass
+            if current_mode not in BEHAVIOURS or current_mode == "idle":
+                last_blink_time = blink_if_needed(engine, last_blink_time)
+            moving = publish_pose(pubs, engine.evaluate(time.monotonic()), moving)
 
-            rate.sleep()
+            # Sleep until the next tick, or wake up early if the mode changes
+            scheduler.end_tick(mode_events)
 
     except rospy.ROSInterruptException:
         pass
     finally:
+        audio_thread.stop()
+        print(f"[MIRO AUDIO] {audio_thread.stats()}")
+        print(f"[MIRO LOOP] {tick_stats.report()}")
         print("[MIRO] Final reset.")
-        exit_mode(current_mode, pubs)
+        exit_mode(current_mode)
+        publish_pose(pubs, NEUTRAL, moving=True)
         pubs["illum"].publish(LED_IDLE)
+        mic_worker.shutdown(wait=True)
         mute_mic()
 
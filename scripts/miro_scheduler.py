@@ -0,0 +1,159 @@
+"""Fixed-rate tick scheduler and timing telemetry for the MiRo control loop.
+
+TickScheduler keeps the loop on a fixed period, sleeping between ticks rather
+than inside them (timed motion such as a blink is an animation clip, see
+miro_animation.py). TickStats records how long each tick's work took,
+how late each tick started (jitter), ticks over the budget and ticks skipped.
+It lives in shared memory so the GUI can read it while the MiRo process runs:
+the MiRo process is the only writer, readers may see a tick half recorded,
+which is fine for telemetry.
+"""
+import ctypes
+import time
+from multiprocessing import RawArray
+
+TICK_RATE = 50
+TICK_PERIOD = 1.0 / TICK_RATE
+TICK_BUDGET = 0.010  # seconds of work per tick, half the period leaves room for ROS and the audio thread
+
+# Upper bounds of the histogram buckets in ms, the last bucket counts everything above
+BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 500)
+
+# Slots in the shared block
+_TICKS = 0
+_OVERRUNS = 1
+_SKIPPED = 2
+_DURATION_SUM = 3
+_DURATION_MAX = 4
+_JITTER_SUM = 5
+_JITTER_MAX = 6
+_DURATION_HIST = 7
+_JITTER_HIST = _DURATION_HIST + len(BUCKETS_MS) + 1
+_SLOTS = _JITTER_HIST + len(BUCKETS_MS) + 1
+
+
+def _bucket(ms):
+    for number, bound in enumerate(BUCKETS_MS):
+        if ms <= bound:
+            return number
+    return len(BUCKETS_MS)
+
+
+def _percentile(hist, pct):
+    """Upper bound (ms) of the bucket holding the pct-th percentile, inf for the overflow bucket."""
+    total = sum(hist)
+    if not total:
+        return 0.0
+    seen = 0
+    for number, count in enumerate(hist):
+        seen += count
+        if seen >= pct / 100.0 * total:
+            return BUCKETS_MS[number] if number < len(BUCKETS_MS) else float("inf")
+    return float("inf")
+
+
+class TickStats:
+    def __init__(self, budget=TICK_BUDGET):
+        # Created before the MiRo process starts so both sides share the same memory
+        self.budget = budget
+        self._block = RawArray(ctypes.c_double, _SLOTS)
+
+    def record(self, duration, jitter):
+        """Record one tick: duration of its work and how late it started, both in seconds."""
+        block = self._block
+        duration_ms, jitter_ms = duration * 1000.0, jitter * 1000.0
+        block[_DURATION_HIST + _bucket(duration_ms)] += 1
+        block[_JITTER_HIST + _bucket(jitter_ms)] += 1
+        block[_DURATION_SUM] += duration_ms
+        block[_JITTER_SUM] += jitter_ms
+        block[_DURATION_MAX] = max(block[_DURATION_MAX], duration_ms)
+        block[_JITTER_MAX] = max(block[_JITTER_MAX], jitter_ms)
+        if duration > self.budget:
+            block[_OVERRUNS] += 1
+        block[_TICKS] += 1
+
+    def record_skipped(self, ticks):
+        self._block[_SKIPPED] += ticks
+
+    def snapshot(self):
+        block = self._block[:]
+        ticks = block[_TICKS]
+        duration_hist = [int(n) for n in block[_DURATION_HIST:_JITTER_HIST]]
+        jitter_hist = [int(n) for n in block[_JITTER_HIST:_SLOTS]]
+        return {
+            "ticks": int(ticks),
+            "overruns": int(block[_OVERRUNS]),
+            "skipped": int(block[_SKIPPED]),
+            "budget_ms": self.budget * 1000.0,
+            "duration_mean_ms": block[_DURATION_SUM] / max(1, ticks),
+            "duration_p99_ms": _percentile(duration_hist, 99),
+            "duration_max_ms": block[_DURATION_MAX],
+            "jitter_mean_ms": block[_JITTER_SUM] / max(1, ticks),
+            "jitter_p99_ms": _percentile(jitter_hist, 99),
+            "jitter_max_ms": block[_JITTER_MAX],
+            "duration_hist": duration_hist,
+            "jitter_hist": jitter_hist,
+        }
+
+    def summary(self):
+        s = self.snapshot()
+        return (f"{s['ticks']} ticks, {s['overruns']} over {s['budget_ms']:.0f} ms budget, {s['skipped']} skipped | "
+                f"work mean {s['duration_mean_ms']:.2f} p99 <={s['duration_p99_ms']:g} max {s['duration_max_ms']:.1f} ms | "
+                f"jitter mean {s['jitter_mean_ms']:.2f} p99 <={s['jitter_p99_ms']:g} max {s['jitter_max_ms']:.1f} ms")
+
+    def report(self):
+        """Summary line plus both histograms, for printing at shutdown."""
+        s = self.snapshot()
+        lines = [self.summary(), f"  {'<= ms':>8} {'work':>8} {'jitter':>8}"]
+        labels = [f"{bound:g}" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]:g}"]
+        for label, work, jitter in zip(labels, s["duration_hist"], s["jitter_hist"]):
+            lines.append(f"  {label:>8} {work:>8} {jitter:>8}")
+        return "\n".join(lines)
+
+
+class TickScheduler:
+    """Runs the loop at a fixed rate and records each tick in a TickStats.
+
+        while running:
+            scheduler.begin_tick()
+            ...                             # the tick's work
+            scheduler.end_tick(mode_events)
+    """
+
+    def __init__(self, stats=None, period=TICK_PERIOD, clock=time.monotonic):
+        self.stats = stats
+        self.period = period
+        self.clock = clock
+        self.next_tick = clock()
+        self._tick_started = None
+        self._jitter = 0.0
+        self._woken_early = False
+
+    def begin_tick(self):
+        now = self.clock()
+        self._tick_started = now
+        # A tick started early by a mode change is not late
+        self._jitter = 0.0 if self._woken_early else max(0.0, now - self.next_tick)
+
+    def end_tick(self, mode_events=None):
+        """Record the tick and sleep until the next one, or until the mode changes."""
+        now = self.clock()
+        if self.stats is not None and self._tick_started is not None:
+            self.stats.record(now - self._tick_started, self._jitter)
+
+        self.next_tick += self.period
+        self._woken_early = False
+        if now > self.next_tick + self.period:
+            # Fell more than a tick behind, don't try to catch up
+            if self.stats is not None:
+                self.stats.record_skipped(int((now - self.next_tick) / self.period))
+            self.next_tick = now
+            return
+
+        delay = max(0.0, self.next_tick - now)
+        if mode_events is None:
+            time.sleep(delay)
+        elif mode_events.wait(delay):
+            mode_events.drain()
+            self.next_tick = self.clock()
+            self._woken_early = True
@@ -0,0 +1,161 @@
+"""Patient profiles: parsed history, past image descriptions, emotion outcomes and settings.
+
+Everything lives in one SQLite file. The launch screen only reads the small
+patients table (id and name, through an index), and a profile's history and
+images are loaded when it is picked, as a SessionBundle that is ready to start
+without re-reading the PDF or asking the vision model again.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from history_ingest import PatientHistory
+
+DEFAULT_STORE_PATH = os.environ.get(
+    "MIRO_PATIENT_STORE",
+    os.path.join(os.path.expanduser("~"), ".cache", "miro_therapy", "patients.sqlite3"),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    settings TEXT NOT NULL DEFAULT '{}',
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS patients_name ON patients (name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS histories (
+    patient_id INTEGER PRIMARY KEY REFERENCES patients (id) ON DELETE CASCADE,
+    source TEXT,
+    hash TEXT,
+    pages TEXT NOT NULL,
+    preview BLOB
+);
+CREATE TABLE IF NOT EXISTS images (
+    patient_id INTEGER NOT NULL REFERENCES patients (id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    description TEXT,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (patient_id, path)
+);
+CREATE TABLE IF NOT EXISTS outcomes (
+    patient_id INTEGER NOT NULL REFERENCES patients (id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    session_at REAL NOT NULL,
+    modes TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outcomes_patient_image ON outcomes (patient_id, path);
+"""
+
+
+class SessionBundle:
+    """Everything needed to start a session for one patient."""
+
+    def __init__(self, patient_id, name, settings, history=None, image_path=None, image_description=None, outcomes=None):
+        self.patient_id = patient_id
+        self.name = name
+        self.settings = settings
+        self.history = history
+        self.image_path = image_path
+        self.image_description = image_description
+        self.outcomes = outcomes or {}  # image path -> summed mode counts over past sessions
+
+
+class PatientStore:
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(_SCHEMA)
+
+    def list_patients(self):
+        """[(id, name)] sorted by name, without loading any history."""
+        with self._lock:
+            return self._db.execute("SELECT id, name FROM patients ORDER BY name COLLATE NOCASE").fetchall()
+
+    def save_patient(self, name, settings=None, patient_id=None):
+        """Create a patient, or with patient_id rename them and update their settings. Returns their id.
+
+        Raises ValueError if another patient already has this name (ignoring case), so
+        two patients never share one history, and KeyError if patient_id does not exist.
+        """
+        with self._lock:
+            clash = self._db.execute("SELECT id FROM patients WHERE name = ? COLLATE NOCASE AND id IS NOT ?",
+                                     (name, patient_id)).fetchone()
+            if clash is not None:
+                raise ValueError(f"A patient called {name!r} already exists")
+            if patient_id is None:
+                cursor = self._db.execute("INSERT INTO patients (name, settings, updated) VALUES (?, ?, ?)",
+                                          (name, json.dumps(settings or {}), time.time()))
+                return cursor.lastrowid
+            row = self._db.execute("SELECT settings FROM patients WHERE id = ?", (patient_id,)).fetchone()
+            if row is None:
+                raise KeyError(patient_id)
+            merged = dict(json.loads(row[0]), **(settings or {}))
+            self._db.execute("UPDATE patients SET name = ?, settings = ?, updated = ? WHERE id = ?",
+                             (name, json.dumps(merged), time.time(), patient_id))
+            return patient_id
+
+    def delete_patient(self, patient_id):
+        with self._lock:
+            self._db.execute("DELETE FROM patients WHERE id = ?", (patient_id,))
+
+    def save_history(self, patient_id, history):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO histories (patient_id, source, hash, pages, preview) VALUES (?, ?, ?, ?, ?)",
+                (patient_id, history.path, history.hash, json.dumps(history.pages), history.preview_png))
+            self._touch(patient_id)
+
+    def save_image(self, patient_id, image_path, description):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO images (patient_id, path, description, last_used) VALUES (?, ?, ?, ?)",
+                (patient_id, image_path, description, time.time()))
+            self._touch(patient_id)
+
+    def record_outcome(self, patient_id, image_path, mode_counts):
+        """Store how a session with this image went, e.g. {"happy": 5, "sad": 1}."""
+        with self._lock:
+            self._db.execute("INSERT INTO outcomes (patient_id, path, session_at, modes) VALUES (?, ?, ?, ?)",
+                             (patient_id, image_path, time.time(), json.dumps(dict(mode_counts))))
+            self._touch(patient_id)
+
+    def load_bundle(self, patient_id):
+        """Load a patient's SessionBundle: history, most recent image and its description, outcomes."""
+        with self._lock:
+            patient = self._db.execute("SELECT name, settings FROM patients WHERE id = ?", (patient_id,)).fetchone()
+            if patient is None:
+                raise KeyError(patient_id)
+            history_row = self._db.execute(
+                "SELECT source, hash, pages, preview FROM histories WHERE patient_id = ?", (patient_id,)).fetchone()
+            image_row = self._db.execute(
+                "SELECT path, description FROM images WHERE patient_id = ? ORDER BY last_used DESC LIMIT 1",
+                (patient_id,)).fetchone()
+            outcome_rows = self._db.execute(
+                "SELECT path, modes FROM outcomes WHERE patient_id = ?", (patient_id,)).fetchall()
+
+        history = None
+        if history_row is not None:
+            source, digest, pages, preview = history_row
+            history = PatientHistory(source, digest, json.loads(pages), preview or b"")
+        outcomes = {}
+        for path, modes in outcome_rows:
+            totals = outcomes.setdefault(path, {})
+            for mode, count in json.loads(modes).items():
+                totals[mode] = totals.get(mode, 0) + count
+        image_path, description = image_row if image_row else (None, None)
+        return SessionBundle(patient_id, patient[0], json.loads(patient[1]), history, image_path, description, outcomes)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _touch(self, patient_id):
+        self._db.execute("UPDATE patients SET updated = ? WHERE id = ?", (time.time(), patient_id))
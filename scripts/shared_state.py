@@ -0,0 +1,158 @@
+"""Shared-memory mode register used by the GUI, the webhook server and the MiRo process.
+
+Replaces multiprocessing.Manager().dict: every read used to be a pickled round
+trip to the manager process. Here the state lives in a small block of shared
+memory, reads are lock-free and writers take a lock only to bump the sequence
+number. The object keeps the dict-style API the rest of the code uses
+(state["current_mode"], state.get(...), state["current_mode"] = "happy").
+
+Processes that want to react to mode changes without polling call subscribe()
+(before the child processes are started) and wait on the returned ModeSubscriber.
+"""
+import ctypes
+import os
+import struct
+import time
+from multiprocessing import Lock, Pipe, RawArray
+
+MODES = ("idle", "happy", "sad", "speaking", "listening")
+_MODE_INDEX = {mode: i for i, mode in enumerate(MODES)}
+
+# Slots in the shared block
+_WORD = 0       # (sequence << 8) | mode index, stored in one write so readers always see a matching pair
+_TIMESTAMP = 1  # time.time_ns() of the last mode change
+_FLAGS = 2      # bit 0: agent_speaking
+_SLOTS = 3
+
+_EVENT = struct.Struct("<QB")  # sequence number, mode index
+
+
+class ModeSubscriber:
+    """One-way pipe that receives (mode, seq) every time the mode changes.
+
+    fileno() can be handed to select() or Tk's createfilehandler. If the reader
+    falls behind and the pipe fills up, events are dropped rather than blocking
+    the writer; the shared block still has the latest mode.
+    """
+
+    def __init__(self):
+        self._reader, self._writer = Pipe(duplex=False)
+        os.set_blocking(self._writer.fileno(), False)
+        self.dropped = 0
+
+    def fileno(self):
+        return self._reader.fileno()
+
+    def _notify(self, event):
+        try:
+            self._writer.send_bytes(event)
+        except OSError:
+            self.dropped += 1
+
+    def wait(self, timeout=None):
+        """Block until an event is available or timeout seconds pass, return True if one is."""
+        return self._reader.poll(timeout)
+
+    def drain(self, on_event=None):
+        """Read every pending event and return the newest (mode, seq), or None if there were none.
+
+        on_event(mode, seq), if given, is called for each event in order.
+        """
+        latest = None
+        while self._reader.poll(0):
+            seq, index = _EVENT.unpack(self._reader.recv_bytes())
+            latest = (MODES[index], seq)
+            if on_event:
+                on_event(*latest)
+        return latest
+
+
+class SharedModeState:
+    KEYS = ("current_mode", "agent_speaking")
+
+    def __init__(self, current_mode="idle", agent_speaking=False):
+        # Created before the child processes start so they inherit the same memory
+        self._block = RawArray(ctypes.c_int64, _SLOTS)
+        self._lock = Lock()
+        self._block[_WORD] = _MODE_INDEX[current_mode]
+        self._block[_TIMESTAMP] = time.time_ns()
+        self._block[_FLAGS] = 1 if agent_speaking else 0
+        self._subscribers = []
+
+    def subscribe(self):
+        """Return a ModeSubscriber notified on every mode change.
+
+        Must be called before the processes that write the mode are started,
+        they only notify the subscribers they inherited.
+        """
+        subscriber = ModeSubscriber()
+        self._subscribers.append(subscriber)
+        return subscriber
+
+    # Mode register
+    @property
+    def mode(self):
+        return MODES[self._block[_WORD] & 0xFF]
+
+    @property
+    def seq(self):
+        """Number of mode changes so far, lets readers tell whether anything happened."""
+        return self._block[_WORD] >> 8
+
+    @property
+    def timestamp(self):
+        """Wall clock time (seconds) of the last mode change."""
+        return self._block[_TIMESTAMP] / 1e9
+
+    def snapshot(self):
+        """Return (mode, seq, timestamp) for the latest mode change."""
+        word = self._block[_WORD]
+        return MODES[word & 0xFF], word >> 8, self._block[_TIMESTAMP] / 1e9
+
+    def set_mode(self, mode):
+        if mode not in _MODE_INDEX:
+            raise ValueError(f"Unknown mode: {mode}")
+        with self._lock:
+            seq = (self._block[_WORD] >> 8) + 1
+            self._block[_TIMESTAMP] = time.time_ns()
+            self._block[_WORD] = (seq << 8) | _MODE_INDEX[mode]
+            if self._subscribers:
+                event = _EVENT.pack(seq, _MODE_INDEX[mode])
+                for subscriber in self._subscribers:
+                    subscriber._notify(event)
+        return seq
+
+    # Dict-style API, same as the Manager().dict it replaces
+    def __getitem__(self, key):
+        if key == "current_mode":
+            return self.mode
+        if key == "agent_speaking":
+            return bool(self._block[_FLAGS] & 1)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "current_mode":
+            self.set_mode(value)
+        elif key == "agent_speaking":
+            with self._lock:
+                self._block[_FLAGS] = (self._block[_FLAGS] & ~1) | (1 if value else 0)
+        else:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self.KEYS)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return repr({key: self[key] for key in self.KEYS})
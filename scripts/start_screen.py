@@ -1,24 +1,74 @@
 #!/usr/bin/env python3
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog
 from pathlib import Path
 from PIL import Image, ImageTk
-import fitz  # PyMuPDF
+import io
 import time
-import psutil
+import threading
 import subprocess
-from multiprocessing import Process, Manager, Queue
+from multiprocessing import Pipe, Process
 import os
+from collections import Counter
 
-from image_description import ImageDescriber
-from vapi_therapist import Vapi_TheRapist
-from main import create_app
-from miro_emotions import run_miro_with_queue
+from shared_state import SharedModeState
+from description_cache import DescriptionCache
+from description_worker import DescriptionWorker
+from patient_store import PatientStore
 
-def run_vapi_in_process(image_description, patient_history, audio_queue):
-    from vapi_therapist import Vapi_TheRapist
-    vapi = Vapi_TheRapist(image_description, patient_history, audio_queue)
-    vapi.create_and_start_assistant()
+# Heavy modules (openai, FastAPI, daily, pyaudio, rospy, PyMuPDF) are imported
+# inside the functions below, in the process that uses them and only when it
+# does, so the window comes up without waiting for any of them.
+
+# Longest transcript forwarded for history lookup, keeps each message under PIPE_BUF so a
+# non-blocking write is all or nothing
+MAX_FORWARDED_CHARS = 1000
+
+def run_api_in_process(shared_state, host="0.0.0.0", port=8000, transcript_conn=None):
+    from uvicorn import run
+    from main import create_app
+
+    if transcript_conn is not None:
+        # Called on the server's event loop: never block it on a Vapi process that is not reading
+        os.set_blocking(transcript_conn.fileno(), False)
+
+    def forward_transcript(text):
+        try:
+            transcript_conn.send(text[:MAX_FORWARDED_CHARS])
+        except OSError:
+            pass  # pipe full or the Vapi process is gone, the history lookup is skipped
+
+    run(create_app(shared_state, on_user_text=forward_transcript if transcript_conn else None), host=host, port=port)
+
+def run_miro_in_process(shared_state, audio_queue, mode_events, tick_stats):
+    from miro_emotions import run_miro_with_queue
+    run_miro_with_queue(shared_state, audio_queue, mode_events, tick_stats)
+
+def run_vapi_in_process(session_conn, audio_queue, warm_started_at, transcript_conn=None, gui_conn=None):
+    # Pre-warm: Daily, the audio devices and the API connection are set up as soon
+    # as the server starts, then the process waits for Start Therapy to send the session
+    if gui_conn is not None:
+        gui_conn.close()  # our copy of the GUI's end, or closing the GUI's would never reach recv() as EOF
+    from vapi_therapist import StartupTimeline, Vapi_TheRapist
+    timeline = StartupTimeline(warm_started_at, "pre-warm")
+    timeline.mark("process started")
+    vapi = Vapi_TheRapist(audio_queue=audio_queue, timeline=timeline)
+    vapi.wait_until_warm()
+
+    try:
+        session = session_conn.recv()
+    except EOFError:
+        return  # GUI closed before a session was started
+    image_description, patient_history, start_pressed_at = session
+    timeline.restart(start_pressed_at, "session")
+    timeline.mark("session received")
+    if transcript_conn is not None:
+        # Transcripts left over from the previous session belong to another call
+        while transcript_conn.poll(0):
+            transcript_conn.recv()
+    vapi.create_and_start_assistant(image_description, patient_history)
+    # The patient's words come from the webhook process, each one may bring in more of their history
+    vapi.wait_until_call_ends(transcript_conn)
 
 class ReminiscenceTherapyGUI(ttk.Frame):
     def __init__(self, root, patient_info=None, theme_path=os.path.join(os.path.dirname(__file__), "Azure-ttk-theme-main", "azure.tcl")):
@@ -40,11 +90,21 @@ class ReminiscenceTherapyGUI(ttk.Frame):
         self.pack(fill="both", expand=True)
 
         self.history_file_path = None
+        self.history = None
         self.history_text = None
         self.image_file_path = None
         self.image_type = tk.StringVar(value="personal")
         self.uploaded_photo = None
-        self.patient_name = "Patient"  # Placeholder name
+        self.patient_name = "Patient"  # Until a profile is loaded or saved
+        self.patient_id = None
+        # Only the names are read at launch, a profile's history and images when it is picked
+        self.patient_store = PatientStore()
+
+        self.description_cache = DescriptionCache()
+        self.description_worker = DescriptionWorker(self.root, cache=self.description_cache)
+        self.album_thread = None
+        self.album_cancel = None
+        self.album_progress = None
 
         self._build_image_panel()
         self._build_info_panel()
@@ -53,12 +113,14 @@ class ReminiscenceTherapyGUI(ttk.Frame):
         self.columnconfigure(1, weight=2)
         self.rowconfigure(0, weight=1)
 
+        if patient_info and patient_info.get("patient_id") is not None:
+            self._load_profile(patient_info["patient_id"])
         if patient_info and patient_info.get("history_path"):
-            self.history_file_path = patient_info["history_path"]
-            self._preview_pdf(self.history_file_path)
-            self.history_text = self._extract_text_from_pdf(self.history_file_path)
+            self._load_history_pdf(patient_info["history_path"])
 
         self.vapi_proc = None
+        self.vapi_session_conn = None
+        self.transcript_reader = None
         self.api_proc = None
         self.miro_proc = None
 
@@ -77,6 +139,12 @@ class ReminiscenceTherapyGUI(ttk.Frame):
         self.image_description_widget = tk.Text(desc_frame, height=5, wrap="word", borderwidth=0, highlightthickness=0)
         self.image_description_widget.pack(fill="both", expand=True)
 
+        status_row = ttk.Frame(desc_frame)
+        status_row.pack(fill="x", pady=(6, 0))
+        self.description_status = ttk.Label(status_row, text="", foreground="grey")
+        self.description_status.pack(side="left")
+        self.description_progress = ttk.Progressbar(status_row, mode="indeterminate", length=120)
+
     def _build_info_panel(self):
         panel = ttk.Frame(self)
         panel.grid(row=0, column=1, sticky="nsew")
@@ -84,6 +152,15 @@ class ReminiscenceTherapyGUI(ttk.Frame):
         info_frame = ttk.LabelFrame(panel, text="Patient Info", padding=12)
         info_frame.pack(fill="x")
 
+        profile_row = ttk.Frame(info_frame)
+        profile_row.pack(fill="x")
+        ttk.Label(profile_row, text="Patient:").pack(side="left")
+        self.profile_choice = ttk.Combobox(profile_row, state="readonly", width=24)
+        self.profile_choice.pack(side="left", padx=5)
+        self.profile_choice.bind("<<ComboboxSelected>>", self._on_profile_selected)
+        ttk.Button(profile_row, text="Save Profile", command=self._save_profile).pack(side="right")
+        self._refresh_profiles()
+
         self.history_label = ttk.Label(info_frame, text="History: none uploaded", foreground="grey")
         self.history_label.pack(anchor="w", pady=(5, 0))
         ttk.Button(info_frame, text="Upload History PDF", command=self._upload_history_pdf).pack(anchor="e", pady=5)
@@ -94,48 +171,196 @@ class ReminiscenceTherapyGUI(ttk.Frame):
         self.preview_image_label = ttk.Label(self.history_preview_frame, text="No preview available", anchor="center", justify="center")
         self.preview_image_label.pack(expand=True, fill="both")
 
+        album_frame = ttk.LabelFrame(panel, text="Photo Album", padding=8)
+        album_frame.pack(fill="x", pady=(0, 10))
+        album_buttons = ttk.Frame(album_frame)
+        album_buttons.pack(fill="x")
+        ttk.Button(album_buttons, text="Prepare Album...", command=self._prepare_album).pack(side="left")
+        self.album_cancel_button = ttk.Button(album_buttons, text="Cancel", command=self._cancel_album, state="disabled")
+        self.album_cancel_button.pack(side="left", padx=5)
+        self.album_progress_bar = ttk.Progressbar(album_frame, mode="determinate")
+        self.album_progress_bar.pack(fill="x", pady=(6, 0))
+        self.album_status = ttk.Label(album_frame, text="Describe a folder of photos ahead of the session", foreground="grey")
+        self.album_status.pack(anchor="w")
+
         ttk.Button(panel, text="Start Server", command=self._start_server).pack(fill="x", pady=(10, 5), ipady=8)
         ttk.Button(panel, text="Start Therapy", command=self._start_therapy_session).pack(fill="x", pady=(0, 10), ipady=10)
 
+    def _refresh_profiles(self):
+        self.profiles = self.patient_store.list_patients()
+        self.profile_choice.configure(values=[name for _, name in self.profiles])
+
+    def _on_profile_selected(self, event=None):
+        index = self.profile_choice.current()
+        if index >= 0:
+            self._load_profile(self.profiles[index][0])
+
+    def _load_profile(self, patient_id):
+        started = time.perf_counter()
+        bundle = self.patient_store.load_bundle(patient_id)
+        self.patient_id = bundle.patient_id
+        self.patient_name = bundle.name
+        self.profile_choice.set(bundle.name)
+        self.image_type.set(bundle.settings.get("image_type", "personal"))
+        # Nothing from the previous patient may carry over into this one's session
+        self._clear_session_inputs()
+        if bundle.history is not None:
+            self._show_history(bundle.history)
+        if bundle.image_path and os.path.exists(bundle.image_path) and bundle.image_description:
+            self._show_image(bundle.image_path)
+            self.image_description_widget.delete("1.0", "end")
+            self.image_description_widget.insert("1.0", bundle.image_description)
+            self._set_description_status("Description ready (from profile)")
+        print(f"[PatientStore] Loaded {bundle.name} in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def _clear_session_inputs(self):
+        self.description_worker.cancel()
+        self.history_file_path = None
+        self.history = None
+        self.history_text = None
+        self.history_label.config(text="History: none uploaded")
+        self.preview_image_label.configure(image="", text="No preview available")
+        self.preview_image_label.image = None
+        self.image_file_path = None
+        self.uploaded_photo = None
+        self.image_display.configure(image="", text="No image uploaded")
+        self.image_display.image = None
+        self.image_description_widget.delete("1.0", "end")
+        self._set_description_status("")
+
+    def _save_profile(self):
+        name = simpledialog.askstring("Save Profile", "Patient name:", parent=self.root,
+                                      initialvalue=self.patient_name if self.patient_id is not None else "")
+        if not name or not name.strip():
+            return
+        try:
+            # Saving a loaded profile under a new name renames it, it never takes over another patient
+            self.patient_id = self.patient_store.save_patient(name.strip(), {"image_type": self.image_type.get()},
+                                                              patient_id=self.patient_id)
+        except ValueError as e:
+            messagebox.showerror("Save Profile", f"{e}. Pick that profile from the list, or choose another name.")
+            return
+        self.patient_name = name.strip()
+        if self.history is not None:
+            self.patient_store.save_history(self.patient_id, self.history)
+        self._save_profile_image()
+        self._refresh_profiles()
+        self.profile_choice.set(self.patient_name)
+
+    def _save_profile_image(self):
+        description = self.image_description_widget.get("1.0", "end").strip()
+        if self.patient_id is not None and self.image_file_path and description and not self.description_worker.busy():
+            self.patient_store.save_image(self.patient_id, self.image_file_path, description)
+
+    def _show_image(self, file_path):
+        self.image_file_path = file_path
+        # Decoded once: the thumbnail and the upload to the vision model share it
+        from image_prep import load_image
+        image = load_image(file_path)
+        thumbnail = image.copy()
+        thumbnail.thumbnail((600, 600))
+        self.uploaded_photo = ImageTk.PhotoImage(thumbnail)
+        self.image_display.configure(image=self.uploaded_photo, text="")
+        self.image_display.image = self.uploaded_photo
+        return image
+
     def _upload_image(self):
         file_path = filedialog.askopenfilename(filetypes=[("Image Files", "*.png *.jpg *.jpeg")])
         if file_path:
-            self.image_file_path = file_path
-            image = Image.open(file_path)
-            image.thumbnail((600, 600))
-            self.uploaded_photo = ImageTk.PhotoImage(image)
-            self.image_display.configure(image=self.uploaded_photo, text="")
-            self.image_display.image = self.uploaded_photo
-
-            describer = ImageDescriber(image_path=file_path)
+            image = self._show_image(file_path)
+
+            # Described in the background, a newer upload cancels this one
             self.image_description_widget.delete("1.0", "end")
-            self.image_description_widget.insert("1.0", describer.response.output_text)
+            self._set_description_status("Describing image...", busy=True)
+            self.description_worker.submit(
+                file_path,
+                on_token=self._on_description_token,
+                on_done=self._on_description_done,
+                on_error=self._on_description_error,
+                image=image,
+            )
+
+    def _set_description_status(self, text, busy=False):
+        self.description_status.config(text=text)
+        if busy:
+            self.description_progress.pack(side="right")
+            self.description_progress.start(15)
+        else:
+            self.description_progress.stop()
+            self.description_progress.pack_forget()
+
+    def _on_description_token(self, delta):
+        self.image_description_widget.insert("end", delta)
+        self.image_description_widget.see("end")
+
+    def _on_description_done(self, job):
+        self._set_description_status("Description ready (from cache)" if job.cached else "Description ready")
+
+    def _on_description_error(self, error):
+        self._set_description_status("Description failed")
+        messagebox.showerror("Image Description", f"Could not describe the image:\n{error}")
+
+    def _prepare_album(self):
+        if self.album_thread and self.album_thread.is_alive():
+            messagebox.showinfo("Photo Album", "An album is already being prepared.")
+            return
+        folder = filedialog.askdirectory(title="Choose a photo album folder")
+        if not folder:
+            return
+        from album_batch import describe_album
+
+        self.album_cancel = threading.Event()
+        self.album_progress = None
+
+        def on_progress(progress):
+            self.album_progress = progress  # read by _poll_album on the Tk thread
+
+        self.album_thread = threading.Thread(
+            target=describe_album,
+            args=(folder, self.description_cache),
+            kwargs={"on_progress": on_progress, "cancel_event": self.album_cancel},
+            daemon=True,
+        )
+        self.album_thread.start()
+        self.album_cancel_button.config(state="normal")
+        self.album_status.config(text=f"Preparing {Path(folder).name}...")
+        self.root.after(200, self._poll_album)
+
+    def _poll_album(self):
+        progress = self.album_progress
+        if progress is not None:
+            self.album_progress_bar.config(maximum=max(1, progress.total), value=progress.done)
+            prefix = "Cancelled: " if progress.cancelled else "Done: " if progress.finished else ""
+            self.album_status.config(text=prefix + str(progress))
+        if self.album_thread.is_alive():
+            self.root.after(200, self._poll_album)
+        else:
+            self.album_cancel_button.config(state="disabled")
+
+    def _cancel_album(self):
+        if self.album_cancel:
+            self.album_cancel.set()
+            self.album_status.config(text="Cancelling, waiting for requests already sent...")
 
     def _upload_history_pdf(self):
         file_path = filedialog.askopenfilename(filetypes=[("PDF Files", "*.pdf")])
         if file_path:
-            self.history_file_path = file_path
-            self._preview_pdf(file_path)
-            self.history_text = self._extract_text_from_pdf(file_path)
-
-    def _preview_pdf(self, pdf_path):
-        self.history_label.config(text=f"History: {Path(pdf_path).name}")
-        doc = fitz.open(pdf_path)
-        page = doc.load_page(0)
-        pix = page.get_pixmap()
-        mode = "RGBA" if pix.alpha else "RGB"
-        img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
-        img.thumbnail((500, 400))
-        photo = ImageTk.PhotoImage(img)
-        self.preview_image_label.configure(image=photo, text="")
-        self.preview_image_label.image = photo
-        doc.close()
-
-    def _extract_text_from_pdf(self, pdf_path):
-        doc = fitz.open(pdf_path)
-        text = doc[0].get_text()
-        doc.close()
-        return text.strip()
+            self._load_history_pdf(file_path)
+
+    def _load_history_pdf(self, pdf_path):
+        # Every page is read in one pass, and cached by file hash for the next session
+        from history_ingest import ingest_history
+        self._show_history(ingest_history(pdf_path))
+
+    def _show_history(self, history):
+        self.history_file_path = history.path
+        self.history = history
+        self.history_text = history.bounded_text()
+        self.history_label.config(text=f"History: {Path(history.path).name} ({history.page_count} pages)")
+        if history.preview_png:
+            photo = ImageTk.PhotoImage(Image.open(io.BytesIO(history.preview_png)))
+            self.preview_image_label.configure(image=photo, text="")
+            self.preview_image_label.image = photo
 
     def _show_therapy_view(self):
         self.pack_forget()
@@ -144,12 +369,17 @@ class ReminiscenceTherapyGUI(ttk.Frame):
             self.patient_name,
             self.shared_state,
             self._return_to_main_view,
-            self.uploaded_photo
+            self.uploaded_photo,
+            self.gui_mode_events,
+            self.tick_stats
         )
         self.therapy_frame.pack(fill="both", expand=True)
 
     def _return_to_main_view(self):
         self._end_all_processes()
+        if self.patient_id is not None and self.image_file_path:
+            # How the patient responded to this photo, for choosing photos next time
+            self.patient_store.record_outcome(self.patient_id, self.image_file_path, self.therapy_frame.mode_counts)
         self.therapy_frame.pack_forget()
         self.pack(fill="both", expand=True)
 
@@ -172,6 +402,7 @@ class ReminiscenceTherapyGUI(ttk.Frame):
         ttk.Button(window, text="Copy to Clipboard", command=copy_to_clipboard).pack(pady=5)
 
     def _free_port(self, port=8000):
+        import psutil
         for proc in psutil.process_iter(['pid', 'name']):
             try:
                 for conn in proc.connections(kind='inet'):
@@ -184,14 +415,24 @@ class ReminiscenceTherapyGUI(ttk.Frame):
     def _start_server(self):
         try:
             self._free_port(8000)
-            self.manager = Manager()
-            self.shared_state = self.manager.dict(current_mode="idle", agent_speaking=False)
-            self.audio_queue = Queue()
-
-            from uvicorn import run
-            app = create_app(self.shared_state)
-            self.api_proc = Process(target=run, kwargs={"app": app, "host": "0.0.0.0", "port": 8000}, daemon=True)
+            self.shared_state = SharedModeState(current_mode="idle", agent_speaking=False)
+            # Subscribe before any process is started so every writer notifies both
+            self.robot_mode_events = self.shared_state.subscribe()
+            self.gui_mode_events = self.shared_state.subscribe()
+            from audio_ring import AudioRing
+            self.audio_queue = AudioRing()
+            # MiRo control loop timing, written by the MiRo process and shown in the session view
+            from miro_scheduler import TickStats
+            self.tick_stats = TickStats()
+
+            self.transcript_reader, transcript_writer = Pipe(duplex=False)
+            self.api_proc = Process(target=run_api_in_process, args=(self.shared_state,), kwargs={"host": "0.0.0.0", "port": 8000, "transcript_conn": transcript_writer}, daemon=True)
             self.api_proc.start()
+            transcript_writer.close()  # only the server process writes to it
+            # Kept only to hand to each pre-warmed Vapi process, the GUI never reads it. The server
+            # writes without blocking, so a full pipe drops transcripts instead of stalling the webhook.
+
+            self._prewarm_vapi()
 
             self.ngrok_proc = subprocess.Popen([
                 "bash", "-c", "cd ~ && ./ngrok http --domain=eminent-sought-beetle.ngrok-free.app 8000"
@@ -202,19 +443,49 @@ class ReminiscenceTherapyGUI(ttk.Frame):
         except Exception as e:
             messagebox.showerror("Error", f"Failed to start server:\n{e}")
 
+    def _prewarm_vapi(self):
+        # A second Start Server must not leave the first process holding Daily and the audio devices
+        self._stop_vapi()
+        session_reader, self.vapi_session_conn = Pipe(duplex=False)
+        self.vapi_proc = Process(
+            target=run_vapi_in_process,
+            args=(session_reader, self.audio_queue, time.time(), self.transcript_reader, self.vapi_session_conn),
+            daemon=True
+        )
+        self.vapi_proc.start()
+        # Only the child reads it; closing ours lets the child see EOF when the GUI closes its end
+        session_reader.close()
+
+    def _stop_vapi(self):
+        if self.vapi_proc and self.vapi_proc.is_alive():
+            self.vapi_proc.terminate()
+            self.vapi_proc.join()
+            print("[MainGUI] Vapi process terminated.")
+        self.vapi_proc = None
+        if self.vapi_session_conn:
+            self.vapi_session_conn.close()
+            self.vapi_session_conn = None
+
     def _start_therapy_session(self):
+        start_pressed_at = time.time()
         image_description = self.image_description_widget.get("1.0", "end").strip()
 
+        if self.description_worker.busy():
+            messagebox.showwarning("Image Description", "The image is still being described, please wait for it to finish.")
+            return
+
         if image_description and self.history_text and self.api_proc and self.api_proc.is_alive():
-            self.miro_proc = Process(target=run_miro_with_queue, args=(self.shared_state, self.audio_queue), daemon=True)
+            self.miro_proc = Process(target=run_miro_in_process, args=(self.shared_state, self.audio_queue, self.robot_mode_events, self.tick_stats), daemon=True)
             self.miro_proc.start()
 
-            self.vapi_proc = Process(
-                target=run_vapi_in_process,
-                args=(image_description, self.history_text, self.audio_queue),
-                daemon=True
-            )
-            self.vapi_proc.start()
+            if not (self.vapi_proc and self.vapi_proc.is_alive()):
+                print("[MainGUI] Pre-warmed Vapi process is gone, starting a new one.")
+                self._prewarm_vapi()
+            # Only call creation and join are left on the critical path
+            # The full history goes over, the Vapi process picks the passages to send
+            history = self.history.text if self.history else self.history_text
+            self.vapi_session_conn.send((image_description, history, start_pressed_at))
+            self._save_profile_image()
             self._show_therapy_view()
         else:
             messagebox.showwarning("Missing Information", "Before starting therapy: please upload an image and history PDF, and start the server.")
@@ -222,17 +493,19 @@ class ReminiscenceTherapyGUI(ttk.Frame):
     def _end_all_processes(self):
         print("[MainGUI] Cleaning up processes...")
 
-        if self.vapi_proc and self.vapi_proc.is_alive():
-            self.vapi_proc.terminate()
-            self.vapi_proc.join()
-            print("[MainGUI] Vapi process terminated.")
+        self._stop_vapi()
 
         if self.api_proc and self.api_proc.is_alive():
             self.api_proc.terminate()
             self.api_proc.join()
             print("[MainGUI] FastAPI terminated.")
+        if self.transcript_reader:
+            self.transcript_reader.close()
+            self.transcript_reader = None
 
         if self.miro_proc and self.miro_proc.is_alive():
+            # Terminating skips the MiRo process's own report, so print it from here
+            print(f"[MIRO LOOP] {self.tick_stats.report()}")
             self.miro_proc.terminate()
             self.miro_proc.join()
             print("[MainGUI] MiRo process terminated.")
@@ -242,17 +515,26 @@ class ReminiscenceTherapyGUI(ttk.Frame):
             print("[MainGUI] ngrok terminated.")
 
     def _on_app_exit(self):
+        if self.album_cancel:
+            self.album_cancel.set()
+        self.description_worker.shutdown()
+        stats = self.description_cache.stats()
+        print(f"[DescriptionCache] hits={stats['hits']} misses={stats['misses']} hit rate={stats['hit_rate']:.0%}")
         self._end_all_processes()
+        self.patient_store.close()
         self.root.quit()
         self.root.destroy()
 
 class TherapySessionFrame(ttk.Frame):
-    def __init__(self, parent, patient_name, shared_state, end_session_callback, uploaded_image=None):
+    def __init__(self, parent, patient_name, shared_state, end_session_callback, uploaded_image=None, mode_events=None, tick_stats=None):
         super().__init__(parent, padding=40)
         self.root = parent
         self.shared_state = shared_state
+        self.mode_events = mode_events
+        self.tick_stats = tick_stats
         self.end_session_callback = end_session_callback
         self.start_time = time.time()
+        self.mode_counts = Counter()  # emotional modes MiRo showed this session
 
         self.root.bind_all("<KeyPress-t>", self._toggle_listening_mode)
 
@@ -280,7 +562,17 @@ class TherapySessionFrame(ttk.Frame):
 
         self.mode_label = ttk.Label(controls_frame, text="Mode: idle", font=("Segoe UI", 14, "italic"), foreground="gray")
         self.mode_label.pack(pady=5)
-        self._update_mode_label()
+        if self.mode_events is not None:
+            # Update the label when the mode changes instead of polling the shared state
+            self.root.tk.createfilehandler(self.mode_events.fileno(), tk.READABLE, self._on_mode_event)
+            self._on_mode_event()
+        else:
+            self._update_mode_label()
+
+        self.loop_label = ttk.Label(controls_frame, text="", font=("Segoe UI", 10), foreground="gray", justify="center")
+        self.loop_label.pack(pady=(0, 5))
+        if self.tick_stats is not None:
+            self._update_loop_label()
 
         self.talk_label = ttk.Label(
             controls_frame,
@@ -309,12 +601,28 @@ class TherapySessionFrame(ttk.Frame):
         self.timer_label.config(text=f"Session Time: {elapsed // 60:02d}:{elapsed % 60:02d}")
         self.after(1000, self._update_timer)
 
+    def _update_loop_label(self):
+        stats = self.tick_stats.snapshot()
+        self.loop_label.config(
+            text=f"MiRo loop: work p99 <={stats['duration_p99_ms']:g} ms, jitter p99 <={stats['jitter_p99_ms']:g} ms\n"
+                 f"{stats['overruns']} overruns, {stats['skipped']} skipped of {stats['ticks']} ticks")
+        self.after(1000, self._update_loop_label)
+
     def _update_mode_label(self):
         if self.shared_state:
             mode = self.shared_state.get("current_mode", "idle")
             self.mode_label.config(text=f"Mode: {mode}")
         self.after(500, self._update_mode_label)
 
+    def _on_mode_event(self, *_):
+        if self.mode_events is not None:
+            self.mode_events.drain(on_event=self._count_mode)
+        self.mode_label.config(text=f"Mode: {self.shared_state.get('current_mode', 'idle')}")
+
+    def _count_mode(self, mode, seq):
+        if mode in ("happy", "sad"):
+            self.mode_counts[mode] += 1
+
     def _toggle_listening_mode(self, event=None):
         if self.shared_state:
             current = self.shared_state.get("current_mode")
@@ -322,6 +630,8 @@ class TherapySessionFrame(ttk.Frame):
             print(f"[TherapySession] T key → mode: {self.shared_state['current_mode']}")
 
     def _end_session(self):
+        if self.mode_events is not None:
+            self.root.tk.deletefilehandler(self.mode_events.fileno())
         self.root.unbind_all("<KeyPress-t>")
         self.root.unbind_all("<KeyRelease-t>")
         if callable(self.end_session_callback):
@@ -1,18 +1,57 @@
 #from vapi_python import Vapi
+import threading
+import time
 
 from client_sdk_python_main.vapi_python.vapi_python import Vapi  # use this if buffering is an issue on uni laptop
 from client_sdk_python_main.vapi_python.daily_call import DailyCall
+from history_index import MIN_TOPIC_SCORE, HistoryIndex
+
+class StartupTimeline:
+    """Prints how long after a reference time (server start, Start Therapy) each startup phase finished."""
+
+    def __init__(self, started_at=None, label="pre-warm"):
+        self.restart(started_at, label)
+
+    def restart(self, started_at=None, label="session"):
+        self.started_at = started_at or time.time()
+        self.label = label
+
+    def mark(self, phase):
+        elapsed = time.time() - self.started_at
+        print(f"[Startup] {self.label}: {phase:<24} +{elapsed * 1000:8.1f} ms")
+        return elapsed
 
 class Vapi_TheRapist:
-    def __init__(self, image_description, patient_history, audio_queue):
-        # Initialise Vapi client
-        self.daily_call = DailyCall(audio_queue)  # ← start Daily first
-        self.assistant = Vapi(api_key="", daily_client=self.daily_call)
+    def __init__(self, image_description=None, patient_history=None, audio_queue=None, timeline=None):
+        # Everything up to the call creation happens here, so this can be built
+        # ahead of time (pre-warm) and only create_and_start_assistant waits on the patient
+        self.timeline = timeline or StartupTimeline()
+        self.assistant = Vapi(api_key="")
+        self.assistant.warm_up(background=True)  # connect to the API while Daily and PyAudio start
+        self.daily_call = DailyCall(audio_queue)
+        self.assistant.set_daily_client(self.daily_call)
+        self.timeline.mark("daily + audio devices")
         self.image_description = image_description
         self.patient_history = patient_history
         self.audio_queue = audio_queue
+        self.history_index = None
+        self.sent_passages = []
+
+    def wait_until_warm(self):
+        self.assistant.wait_for_warm_up()
+        self.timeline.mark("api warm-up done")
+
+    def create_and_start_assistant(self, image_description=None, patient_history=None):
+        if image_description is not None:
+            self.image_description = image_description
+        if patient_history is not None:
+            self.patient_history = patient_history
+
+        # Only the parts of the history that matter for this photo, not the whole PDF
+        self.history_index = HistoryIndex.from_text(self.patient_history or "")
+        history_context, self.sent_passages = self.history_index.context_for(self.image_description or "", fill=True)
+        self.timeline.mark("history passages picked")
 
-    def create_and_start_assistant(self):
         assistant_overrides = {
             "recordingEnabled": False,
             "model": {
@@ -22,7 +61,7 @@ class Vapi_TheRapist:
             },
             "variableValues": {
                 "image_description": self.image_description,
-                "patient_history_pdf": self.patient_history
+                "patient_history_pdf": history_context
             }
         }
 
@@ -31,6 +70,49 @@ class Vapi_TheRapist:
             assistant_id='ba05d6d9-8f92-4065-b88b-ecef1ea39d69',
             assistant_overrides=assistant_overrides
         )
+        self.timeline.mark("call created, joining")
+        threading.Thread(target=self._mark_call_progress, daemon=True).start()
+
+    def _mark_call_progress(self):
+        self.daily_call.start_event.wait()
+        if self.daily_call.err or self.daily_call.stop_event.is_set():
+            return
+        self.timeline.mark("joined, audio running")
+        while not self.daily_call.first_audio_event.wait(0.5):
+            if self.daily_call.stop_event.is_set():
+                return
+        self.timeline.mark("first assistant audio")
+
+    def add_history_for(self, topic, budget=800):
+        """Mid-call: send the history passages relevant to topic that the assistant has not had yet.
+
+        Only passages that clearly match topic are sent. Returns the number sent.
+        """
+        if self.history_index is None:
+            return 0
+        text, passages = self.history_index.context_for(topic, budget, exclude=self.sent_passages, pinned=False,
+                                                        min_score=MIN_TOPIC_SCORE)
+        if passages:
+            self.sent_passages.extend(passages)
+            self.assistant.add_message("system", "More from the patient's history:\n" + text)
+        return len(passages)
+
+    def wait_until_call_ends(self, transcript_conn=None):
+        """Block until the call ends. With transcript_conn (a Pipe end receiving the
+        patient's final transcripts) each one is used to send more of their history."""
+        while not self.daily_call.stop_event.is_set():
+            if transcript_conn is None:
+                self.daily_call.stop_event.wait()
+            elif transcript_conn.poll(0.5):
+                try:
+                    text = transcript_conn.recv()
+                except EOFError:
+                    transcript_conn = None  # webhook server stopped
+                    continue
+                sent = self.add_history_for(text)
+                if sent:
+                    print(f"[History] Sent {sent} more passages for: {text}")
 
     def stop_assistant(self):
         self.assistant.stop()
+        self.assistant.close()